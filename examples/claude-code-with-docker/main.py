@@ -11,6 +11,7 @@ import argparse
 import logging
 import os
 import sys
+from typing import Final
 
 from matchlock import Client, Config, Sandbox
 
@@ -22,9 +23,11 @@ except ImportError:  # pragma: no cover
     tty = None
 
 
-logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
 log = logging.getLogger(__name__)
 
+_MATCHLOCK_BIN: Final = os.environ.get("MATCHLOCK_BIN", "matchlock")
+_CONFIG: Final = Config(binary_path=_MATCHLOCK_BIN)
+
 
 class _FDReader:
     def __init__(self, fd: int):
@@ -121,16 +124,16 @@ def run_interactive_shell(client: Client) -> None:
 
 
 def main() -> None:
+    logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
     args = parse_args()
 
     api_key = os.environ.get("ANTHROPIC_API_KEY", "")
     if not api_key:
         raise RuntimeError("ANTHROPIC_API_KEY is required")
 
-    config = Config(binary_path=os.environ.get("MATCHLOCK_BIN", "matchlock"))
     sandbox = build_sandbox(args, api_key)
 
-    client = Client(config)
+    client = Client(_CONFIG)
     try:
         with client:
             vm_id = client.launch(sandbox)
@@ -19,7 +19,7 @@ var (
 	errWriteMutatedFile = errors.New("write mutated file")
 	errReadMutatedFile  = errors.New("read mutated file")
 	errWriteTriggerFile = errors.New("write trigger file")
-	errExecHookRuns     = errors.New("exec hook runs")
+	errExecHookCheck    = errors.New("exec hook check")
 	errReadHookLog      = errors.New("read hook log")
 )
 
@@ -130,17 +130,26 @@ func run() error {
 
 	time.Sleep(400 * time.Millisecond)
 
-	runsResult, err := client.Exec(ctx, "if [ -f /tmp/hook_runs ]; then wc -l < /tmp/hook_runs; else echo 0; fi")
+	// Fetch the run count and the hook log in one round-trip.
+	checkResult, err := client.Exec(ctx, hookCheckCmd)
 	if err != nil {
-		return errx.Wrap(errExecHookRuns, err)
+		return errx.Wrap(errExecHookCheck, err)
 	}
-	fmt.Printf("hook exec runs: %s", runsResult.Stdout)
-
-	hookLog, err := client.ReadFile(ctx, "/workspace/hook.log")
-	if err != nil {
-		return errx.Wrap(errReadHookLog, err)
+	runs, hookLog, ok := splitRecords(checkResult.Stdout)
+	if !ok || checkResult.ExitCode != 0 {
+		return errx.With(errReadHookLog, ": exit_code=%d stderr=%q", checkResult.ExitCode, checkResult.Stderr)
 	}
-	fmt.Printf("hook log content: %q\n", strings.TrimSpace(string(hookLog)))
+	fmt.Printf("hook exec runs: %s", runs)
+	fmt.Printf("hook log content: %q\n", strings.TrimSpace(hookLog))
 
 	return nil
 }
+
+// hookCheckCmd prints the hook run count and the hook log, separated by an
+// ASCII record separator (0x1e). cat's exit status keeps a missing log an error.
+const hookCheckCmd = `if [ -f /tmp/hook_runs ]; then wc -l < /tmp/hook_runs; else echo 0; fi; printf '\036'; cat /workspace/hook.log`
+
+// splitRecords splits hookCheckCmd output at the first record separator.
+func splitRecords(out string) (string, string, bool) {
+	return strings.Cut(out, "\x1e")
+}
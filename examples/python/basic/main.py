@@ -35,7 +35,7 @@ sandbox = (
     )
 )
 
-SCRIPT = """\
+SCRIPT = b"""\
 # /// script
 # requires-python = ">=3.12"
 # dependencies = ["anthropic"]
@@ -57,10 +57,7 @@ with Client() as client:
     vm_id = client.launch(sandbox)
     log.info("sandbox ready vm=%s", vm_id)
 
-    result = client.exec("python3 --version")
-    print(result.stdout, end="")
-
-    result = client.exec("pip install --quiet uv")
+    result = client.exec("python3 --version; pip install --quiet uv")
     print(result.stdout, end="")
 
     client.write_file("/workspace/ask.py", SCRIPT)
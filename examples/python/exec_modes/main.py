@@ -11,10 +11,16 @@ Run:
 
 from __future__ import annotations
 
+import contextlib
+import functools
 import logging
 import os
+import selectors
 import sys
 import io
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Final
 
 from matchlock import Client, Config, Sandbox
 
@@ -26,28 +32,116 @@ except ImportError:  # pragma: no cover
     tty = None
 
 
-logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
 log = logging.getLogger(__name__)
 
+_MATCHLOCK_BIN: Final = os.environ.get("MATCHLOCK_BIN", "matchlock")
+_CONFIG: Final = Config(binary_path=_MATCHLOCK_BIN)
 
-class _FDReader:
-    """Read bytes directly from a TTY fd without Python buffering."""
+STREAM_CMD: Final = "echo stream:start; sleep 1; echo stream:end"
+PIPE_CMD: Final = "cat; echo pipe-stderr >&2"
+INTERACTIVE_CMD: Final = "sh"
+
+
+def _write_stdout(data: bytes) -> None:
+    """Write straight to the stdout fd, bypassing the text layer."""
+    sys.stdout.flush()
+    view = memoryview(data)
+    while view:
+        view = view[os.write(sys.stdout.fileno(), view) :]
+
+
+@contextlib.contextmanager
+def _raw_tty(fd: int) -> Iterator[None]:
+    """Put the TTY in raw mode and restore the saved state immediately on exit.
+
+    TCSANOW skips waiting for the output queue to drain; the SDK has already
+    written everything by the time the session ends.
+    """
+    old_state = termios.tcgetattr(fd)
+    tty.setraw(fd)
+    attrs = termios.tcgetattr(fd)
+    attrs[6][termios.VMIN] = 1
+    attrs[6][termios.VTIME] = 0
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+    try:
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSANOW, old_state)
+
+
+def _coalesce_us_from_env() -> int:
+    """Parse ``MATCHLOCK_TTY_COALESCE_US``, treating bad values as 0 (off)."""
+    raw = os.environ.get("MATCHLOCK_TTY_COALESCE_US", "0")
+    try:
+        return int(raw)
+    except ValueError:
+        log.warning(
+            "ignoring invalid MATCHLOCK_TTY_COALESCE_US=%r; expected microseconds", raw
+        )
+        return 0
 
-    def __init__(self, fd: int):
-        self._fd = fd
 
-    def read(self, size: int = 4096) -> bytes:
-        chunk_size = size if size > 0 else 4096
+class _FDReader:
+    """Read bytes directly from a TTY fd without Python buffering.
+
+    Reads land in a preallocated buffer so each keystroke costs one
+    ``readv`` syscall instead of a fresh allocation inside ``os.read``.
+    The fd is watched through a selector (epoll on Linux), so the reader
+    only wakes when input is actually pending.
+
+    Setting ``MATCHLOCK_TTY_COALESCE_US`` (off by default, since it delays
+    every keystroke by up to that long) folds input that follows the first
+    byte within that window into the same chunk, so pastes and held keys go
+    out as one write.
+    """
+
+    def __init__(
+        self,
+        fd: int,
+        buffer_size: int = 65536,
+        coalesce_us: int | None = None,
+    ):
+        self._fd = fd
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(fd, selectors.EVENT_READ)
+        if coalesce_us is None:
+            coalesce_us = _coalesce_us_from_env()
+        self._coalesce_seconds = max(coalesce_us, 0) / 1_000_000
+
+    def read(self, size: int = -1) -> bytes:
+        view = self._view[:size] if 0 < size < len(self._buf) else self._view
+        return bytes(view[: self.readinto(view)])
+
+    def readinto(self, buf: bytearray | memoryview) -> int:
+        """Read pending input straight into ``buf``; the SDK prefers this."""
+        view = memoryview(buf).cast("B")
         try:
-            return os.read(self._fd, chunk_size)
-        except OSError:
-            return b""
+            self._selector.select()
+            n = os.readv(self._fd, [view])
+        except (OSError, ValueError):
+            return 0
+        while 0 < n < len(view) and self._coalesce_seconds > 0:
+            try:
+                if not self._selector.select(timeout=self._coalesce_seconds):
+                    break
+                got = os.readv(self._fd, [view[n:]])
+            except (OSError, ValueError):
+                break
+            if got == 0:
+                break
+            n += got
+        return n
+
+    def close(self) -> None:
+        self._selector.close()
 
 
 def run_exec_stream(client: Client) -> None:
-    print("== exec_stream ==")
+    _write_stdout(b"== exec_stream ==\n")
     result = client.exec_stream(
-        "echo stream:start; sleep 1; echo stream:end",
+        STREAM_CMD,
         stdout=sys.stdout,
         stderr=sys.stderr,
         working_dir="/workspace",
@@ -55,26 +149,37 @@ def run_exec_stream(client: Client) -> None:
     print(f"stream exit={result.exit_code} duration_ms={result.duration_ms}")
 
 
-def run_exec_pipe(client: Client) -> None:
-    print("\n== exec_pipe ==")
-    stdout_buf = io.StringIO()
-    stderr_buf = io.StringIO()
+def run_exec_pipe(client: Client) -> bytes:
+    """Run the pipe demo and return its report instead of printing it.
+
+    Buffering the report lets the demo run alongside exec_stream without
+    interleaving output.
+    """
+    stdout_buf = io.BytesIO()
+    stderr_buf = io.BytesIO()
+    stdout_text = io.TextIOWrapper(stdout_buf, encoding="utf-8", write_through=True)
+    stderr_text = io.TextIOWrapper(stderr_buf, encoding="utf-8", write_through=True)
     result = client.exec_pipe(
-        "cat; echo pipe-stderr >&2",
+        PIPE_CMD,
         stdin=io.BytesIO(b"hello from stdin\n"),
-        stdout=stdout_buf,
-        stderr=stderr_buf,
+        stdout=stdout_text,
+        stderr=stderr_text,
         working_dir="/workspace",
     )
-    print(f"pipe exit={result.exit_code} duration_ms={result.duration_ms}")
-    print("pipe stdout:")
-    print(stdout_buf.getvalue(), end="")
-    print("pipe stderr:")
-    print(stderr_buf.getvalue(), end="")
+    return b"".join(
+        (
+            b"\n== exec_pipe ==\n",
+            f"pipe exit={result.exit_code} duration_ms={result.duration_ms}\n".encode(),
+            b"pipe stdout:\n",
+            stdout_buf.getvalue(),
+            b"pipe stderr:\n",
+            stderr_buf.getvalue(),
+        )
+    )
 
 
 def run_exec_interactive(client: Client) -> None:
-    print("\n== exec_interactive ==")
+    _write_stdout(b"\n== exec_interactive ==\n")
     if (
         not sys.stdin.isatty()
         or not sys.stdout.isatty()
@@ -91,39 +196,48 @@ def run_exec_interactive(client: Client) -> None:
 
     print("Connected to sandbox shell. Type 'exit' or press Ctrl-D to quit.")
 
-    old_state = termios.tcgetattr(fd)
-    tty.setraw(fd)
+    stdin_reader = _FDReader(fd)
     try:
-        stdin_reader = _FDReader(fd)
-        result = client.exec_interactive(
-            "sh",
-            stdin=stdin_reader,
-            stdout=sys.stdout,
-            working_dir="/workspace",
-            rows=rows,
-            cols=cols,
-        )
+        with _raw_tty(fd):
+            result = client.exec_interactive(
+                INTERACTIVE_CMD,
+                stdin=stdin_reader,
+                stdout=sys.stdout,
+                working_dir="/workspace",
+                rows=rows,
+                cols=cols,
+            )
     finally:
-        termios.tcsetattr(fd, termios.TCSADRAIN, old_state)
+        stdin_reader.close()
 
-    print(f"\nShell exited: code={result.exit_code} duration_ms={result.duration_ms}")
+    _write_stdout(
+        f"\nShell exited: code={result.exit_code} duration_ms={result.duration_ms}\n".encode()
+    )
 
 
-def main() -> None:
-    sandbox = (
+@functools.cache
+def _spec() -> Sandbox:
+    """Build the sandbox spec once; launch() never mutates it."""
+    return (
         Sandbox("alpine:latest").with_workspace("/workspace").mount_memory("/workspace")
     )
 
-    config = Config(binary_path=os.environ.get("MATCHLOCK_BIN", "matchlock"))
 
-    client = Client(config)
+def main() -> None:
+    logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
+
+    client = Client(_CONFIG)
     try:
         with client:
-            vm_id = client.launch(sandbox)
-            log.info("sandbox ready vm=%s binary=%s", vm_id, config.binary_path)
-
-            run_exec_stream(client)
-            run_exec_pipe(client)
+            vm_id = client.launch(_spec())
+            log.info("sandbox ready vm=%s binary=%s", vm_id, _CONFIG.binary_path)
+
+            # exec_stream and exec_pipe are independent; run the pipe demo on a
+            # worker while the stream demo prints live.
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pipe_report = pool.submit(run_exec_pipe, client)
+                run_exec_stream(client)
+                _write_stdout(pipe_report.result())
             run_exec_interactive(client)
     finally:
         try:
@@ -11,12 +11,15 @@ Usage:
 
 from __future__ import annotations
 
+import functools
 import logging
 import os
 import sys
+from typing import Final
 
 from matchlock import (
     Client,
+    Config,
     NetworkHookRequest,
     NetworkHookRequestMutation,
     NetworkHookResult,
@@ -25,10 +28,15 @@ from matchlock import (
     Sandbox,
 )
 
-logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
 log = logging.getLogger(__name__)
 
-SCRIPT = """\
+_MATCHLOCK_BIN: Final = os.environ.get("MATCHLOCK_BIN", "matchlock")
+_CONFIG: Final = Config(binary_path=_MATCHLOCK_BIN)
+
+SETUP_CMD: Final = "python3 --version; pip install --quiet uv"
+RUN_CMD: Final = "uv run /ask.py"
+
+SCRIPT = b"""\
 # /// script
 # requires-python = ">=3.12"
 # dependencies = ["anthropic"]
@@ -47,20 +55,27 @@ print()
 """
 
 
-def main() -> None:
-    api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+class _InjectAPIKey:
+    """Before-hook that sets the real X-Api-Key header on Anthropic requests."""
+
+    def __init__(self, api_key: str) -> None:
+        self._api_key_values = [api_key]
 
-    def before_hook(req: NetworkHookRequest) -> NetworkHookResult:
-        headers = {
-            key: list(values) for key, values in (req.request_headers or {}).items()
-        }
-        headers["X-Api-Key"] = [api_key]
+    def __call__(self, req: NetworkHookRequest) -> NetworkHookResult:
+        # Shallow copy: only the X-Api-Key slot is replaced, and the SDK
+        # serialises the mutation before the request object is discarded.
+        headers = dict(req.request_headers or ())
+        headers["X-Api-Key"] = self._api_key_values
         return NetworkHookResult(
             action="mutate",
             request=NetworkHookRequestMutation(headers=headers),
         )
 
-    sandbox = (
+
+@functools.cache
+def _spec() -> Sandbox:
+    """Build the sandbox spec once; launch() never mutates it."""
+    return (
         Sandbox("python:3.12-alpine")
         .allow_host(
             "dl-cdn.alpinelinux.org",
@@ -78,28 +93,29 @@ def main() -> None:
                         name="inject-anthropic-api-key",
                         phase="before",
                         hosts=["api.anthropic.com"],
-                        hook=before_hook,
+                        hook=_InjectAPIKey(os.environ.get("ANTHROPIC_API_KEY", "")),
                     )
                 ]
             )
         )
     )
 
-    client = Client()
+
+def main() -> None:
+    logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
+    client = Client(_CONFIG)
     try:
         with client:
-            vm_id = client.launch(sandbox)
+            vm_id = client.launch(_spec())
             log.info("sandbox ready vm=%s", vm_id)
 
-            version = client.exec("python3 --version")
-            print(version.stdout, end="")
-
-            client.exec("pip install --quiet uv")
+            setup = client.exec(SETUP_CMD)
+            print(setup.stdout, end="")
 
             client.write_file("/ask.py", SCRIPT)
 
             result = client.exec_stream(
-                "uv run /ask.py",
+                RUN_CMD,
                 stdout=sys.stdout,
                 stderr=sys.stderr,
             )
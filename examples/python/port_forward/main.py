@@ -15,39 +15,87 @@ Run:
 
 from __future__ import annotations
 
+import functools
+import http.client
 import logging
 import os
+import socket
 import time
-from urllib.request import urlopen
+from typing import Final
+from urllib.parse import urlsplit
 
 from matchlock import Client, Config, Sandbox
 
-logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
 log = logging.getLogger(__name__)
 
+_MATCHLOCK_BIN: Final = os.environ.get("MATCHLOCK_BIN", "matchlock")
+_CONFIG: Final = Config(binary_path=_MATCHLOCK_BIN)
+
+
+def _tcp_ready(host: str, port: int, deadline: float) -> bool:
+    """Probe host:port with TCP connects every 10ms until it accepts or deadline."""
+    while True:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(0.05)
+            if sock.connect_ex((host, port)) == 0:
+                return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+
 
 def wait_for_http(url: str, attempts: int = 30, delay_seconds: float = 0.25) -> str:
-    """Poll URL until it serves HTTP 200 or retries are exhausted."""
+    """Wait until URL serves HTTP 200 or ``attempts * delay_seconds`` elapse.
+
+    Readiness is probed with cheap TCP connects; an HTTP GET is only issued
+    once the listener accepts. The forwarded host port can accept before
+    the guest service is up, so a failed GET drops back to probing.
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or "127.0.0.1"
+    port = parts.port or 80
+    path = parts.path or "/"
+    deadline = time.monotonic() + attempts * delay_seconds
+    conn = http.client.HTTPConnection(host, port, timeout=1.5)
     last_error: Exception | None = None
-    for _ in range(attempts):
-        try:
-            with urlopen(url, timeout=1.5) as response:
+    # A listener that answers with an error (e.g. 502 while the guest starts)
+    # is retried with exponential backoff, capped at ``delay_seconds``.
+    backoff = 0.01
+    try:
+        while _tcp_ready(host, port, deadline):
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                body = response.read()
                 if response.status == 200:
-                    return response.read().decode("utf-8", errors="replace")
-        except Exception as exc:  # noqa: BLE001
-            last_error = exc
-        time.sleep(delay_seconds)
+                    return body.decode("utf-8", errors="replace")
+                last_error = RuntimeError(f"unexpected status {response.status}")
+            except (OSError, http.client.HTTPException) as exc:
+                last_error = exc
+                conn.close()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(backoff, remaining))
+            backoff = min(backoff * 2, delay_seconds)
+    finally:
+        conn.close()
     raise RuntimeError(f"timed out waiting for {url}; last_error={last_error!r}")
 
 
+@functools.cache
+def _spec() -> Sandbox:
+    """Build the sandbox spec once; launch() never mutates it."""
+    return Sandbox("nginx:alpine").with_port_forward(8080, 80)
+
+
 def main() -> None:
-    sandbox = Sandbox("nginx:alpine").with_port_forward(8080, 80)
-    config = Config(binary_path=os.environ.get("MATCHLOCK_BIN", "matchlock"))
+    logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
 
-    client = Client(config)
+    client = Client(_CONFIG)
     try:
         with client:
-            vm_id = client.launch(sandbox)
+            vm_id = client.launch(_spec())
             log.info("sandbox ready vm=%s", vm_id)
 
             # Customize nginx page content in-guest.
@@ -11,6 +11,7 @@ Usage:
 
 from __future__ import annotations
 
+import functools
 import logging
 import time
 
@@ -29,7 +30,6 @@ from matchlock import (
     VFSMutateRequest,
 )
 
-logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
 log = logging.getLogger(__name__)
 
 
@@ -65,8 +65,10 @@ def block_action_hook(req: VFSActionRequest) -> str:
     return VFS_HOOK_ACTION_BLOCK
 
 
-def main() -> None:
-    sandbox = Sandbox("alpine:latest").with_workspace("/workspace").mount_memory("/workspace").with_vfs_interception(
+@functools.cache
+def _spec() -> Sandbox:
+    """Build the sandbox spec once; launch() never mutates it."""
+    return Sandbox("alpine:latest").with_workspace("/workspace").mount_memory("/workspace").with_vfs_interception(
         VFSInterceptionConfig(
             rules=[
                 VFSHookRule(
@@ -102,8 +104,11 @@ def main() -> None:
         )
     )
 
+
+def main() -> None:
+    logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
     with Client() as client:
-        vm_id = client.launch(sandbox)
+        vm_id = client.launch(_spec())
         log.info("sandbox ready vm=%s", vm_id)
 
         try:
@@ -14,17 +14,81 @@ Usage with builder API:
         print(result.stdout)
 """
 
-import base64
-import copy
+import codecs
+import dataclasses
 import fnmatch
+import itertools
 import json
+import operator
 import os
+import queue
+import re
+import select
+import selectors
 import shutil
 import socket
 import subprocess
 import tempfile
 import threading
-from typing import IO, Any, Callable, Iterable
+import time
+from typing import IO, Any, Callable, Iterable, Iterator, Mapping, cast
+
+try:
+    # SIMD-accelerated drop-in; install with ``pip install matchlock[fast]``.
+    from pybase64 import b64decode, b64encode
+except ImportError:  # pragma: no cover - optional dependency
+    # binascii directly: base64.b64encode/b64decode are Python wrappers
+    # around these that re-validate and convert their argument first.
+    from binascii import a2b_base64 as b64decode
+    from binascii import b2a_base64
+
+    def b64encode(s: bytes) -> bytes:
+        return b2a_base64(s, newline=False)
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+# json.dumps defaults (ASCII escapes) for values the fast paths reject:
+# lone surrogates, e.g. from surrogateescape-decoded paths, and dict keys
+# that are not strings.
+_json_encode_ascii = json.JSONEncoder(separators=(",", ":")).encode
+
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            return _json_encode_ascii(obj).encode("ascii")
+
+    def _json_dumps_line(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+        except orjson.JSONEncodeError:
+            return (_json_encode_ascii(obj) + "\n").encode("ascii")
+
+else:  # pragma: no cover - optional dependency
+    # Compact, UTF-8 output like orjson: no padding after separators and no
+    # \u escapes for non-ASCII paths and hostnames.
+    _json_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+    def _json_dumps(obj: Any) -> bytes:
+        try:
+            return _json_encode(obj).encode("utf-8")
+        except UnicodeEncodeError:
+            return _json_encode_ascii(obj).encode("ascii")
+
+    def _json_dumps_line(obj: Any) -> bytes:
+        try:
+            return (_json_encode(obj) + "\n").encode("utf-8")
+        except UnicodeEncodeError:
+            return (_json_encode_ascii(obj) + "\n").encode("ascii")
+
+    _json_loads = json.loads
 
 from .builder import Sandbox
 from .types import (
@@ -55,6 +119,305 @@ from .types import (
     VFSMutateRequest,
 )
 
+# Kernel buffer size requested for Config.use_socketpair; Linux caps it at
+# net.core.{r,w}mem_max.
+_SOCKET_BUFFER_SIZE = 1 << 20
+
+_file_info_fields = operator.itemgetter("name", "size", "mode", "is_dir")
+
+# Bytes requested per read() of the server's stdout.
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Requests at least this large are written straight to the pipe fd; the
+# stdin BufferedWriter is sized to match so anything smaller is one copy
+# and one write().
+_RAW_WRITE_THRESHOLD = 64 * 1024
+
+# How often a waiting request checks whether the server process has exited.
+_PROCESS_POLL_INTERVAL = 0.5
+
+# Serialized '{"jsonrpc":"2.0","method":<m>,"id":' per method name. Only the
+# id and params vary between requests, so the envelope is built once.
+_request_prefixes: dict[str, bytes] = {}
+
+# The server marshals notifications from Go maps, so keys are emitted sorted
+# and compact; file events therefore always start with this prefix.
+_EVENT_NOTIFICATION_PREFIX = b'{"jsonrpc":"2.0","method":"event"'
+
+# Whole cancel frame; only the two ids vary.
+_CANCEL_REQUEST = b'{"jsonrpc":"2.0","method":"cancel","id":%d,"params":{"id":%d}}\n'
+
+# Notifications routed to the pending request named by params["id"].
+_STREAM_NOTIFICATION_METHODS = frozenset(
+    (
+        "exec_stream.stdout",
+        "exec_stream.stderr",
+        "exec_pipe.ready",
+        "exec_pipe.stdout",
+        "exec_pipe.stderr",
+        "exec_tty.ready",
+        "exec_tty.stdout",
+        "log_stream.data",
+    )
+)
+
+# recv_into() size for network hook callback requests.
+_HOOK_RECV_SIZE = 16 * 1024
+
+# Decision/action values that mean "allow", and the canonical network hook
+# phases, looked up without re-normalising the common exact-match case.
+_VFS_ALLOW_DECISIONS = frozenset(("", VFS_HOOK_ACTION_ALLOW))
+_NETWORK_ALLOW_ACTIONS = frozenset(("", NETWORK_HOOK_ACTION_ALLOW))
+_NETWORK_HOOK_PHASES: dict[str, NetworkHookPhase] = {
+    "before": "before",
+    "after": "after",
+}
+
+# Upper bound on threads running local VFS event callbacks per client.
+_VFS_HOOK_WORKERS = 8
+
+# Upper bound on threads running network hook callbacks per client. Requests
+# are read on the accept thread, so only complete callbacks take a worker.
+_NETWORK_HOOK_WORKERS = 32
+
+# Seconds to wait for a network hook callback request once its connection
+# is accepted. The sandbox writes the request right after dialing, so this
+# only bounds how long a stalled peer can hold its connection open.
+_NETWORK_HOOK_READ_TIMEOUT = 5.0
+
+# Validation for each VFS callback kind: (error label, required phase,
+# whether an empty phase is accepted).
+_VFS_CALLBACK_RULES: dict[str, tuple[str, str, bool]] = {
+    "hook": ("callback hooks", VFS_HOOK_PHASE_AFTER, False),
+    "dangerous_hook": ("dangerous_hook", VFS_HOOK_PHASE_AFTER, False),
+    "mutate_hook": ("mutate_hook", VFS_HOOK_PHASE_BEFORE, True),
+    "action_hook": ("action_hook", VFS_HOOK_PHASE_BEFORE, True),
+}
+
+
+def _compile_path_matcher(pattern: str) -> Callable[[str], Any] | None:
+    """Build a hook path predicate once; None means the hook matches any path.
+
+    Literal paths compare with ``==``; only real globs go through a regex.
+    """
+    if not pattern:
+        return None
+    if not any(c in pattern for c in "*?["):
+        return pattern.__eq__
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+def _to_string_map(value: Any) -> dict[str, str] | None:
+    if not isinstance(value, dict):
+        return None
+    out: dict[str, str] = {}
+    for k, v in value.items():
+        out[str(k)] = str(v)
+    return out
+
+
+def _to_string_slice_map(value: Any) -> dict[str, list[str]] | None:
+    if not isinstance(value, dict):
+        return None
+    out: dict[str, list[str]] = {}
+    for k, v in value.items():
+        if isinstance(v, list):
+            out[str(k)] = [str(x) for x in v]
+        else:
+            out[str(k)] = [str(v)]
+    return out
+
+
+def _clone_string_map(value: dict[str, str]) -> dict[str, str]:
+    return {str(k): str(v) for k, v in value.items()}
+
+
+def _clone_string_slice_map(value: dict[str, list[str]]) -> dict[str, list[str]]:
+    return {str(k): [str(x) for x in v] for k, v in value.items()}
+
+
+def _wait_for_exit(process: subprocess.Popen[bytes], timeout: float) -> None:
+    """``process.wait(timeout)`` that sleeps on a pidfd where available.
+
+    Popen.wait() with a timeout polls waitpid(WNOHANG) with growing sleeps;
+    a pidfd (Linux 5.3+) wakes us exactly when the child exits. Raises
+    :class:`subprocess.TimeoutExpired` like Popen.wait().
+    """
+    # Other threads poll() the process too; once it is reaped its pid may be
+    # reused, and a pidfd would then wait on an unrelated process.
+    if process.poll() is not None:
+        return
+    pid = getattr(process, "pid", None)
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open is not None and isinstance(pid, int):
+        try:
+            fd = pidfd_open(pid)
+        except OSError:
+            # Already reaped, or pidfds unsupported by this kernel.
+            pass
+        else:
+            try:
+                # Reaped between poll() and pidfd_open(): fd may not be ours.
+                if process.returncode is not None:
+                    return
+                poller = select.poll()
+                poller.register(fd, select.POLLIN)
+                if not poller.poll(timeout * 1000):
+                    raise subprocess.TimeoutExpired(process.args, timeout)
+            finally:
+                os.close(fd)
+    process.wait(timeout=timeout)
+
+
+def _chunk_writer(writer: IO[str] | None) -> Callable[[str], None]:
+    """Return a callback that writes base64 stream chunks to ``writer``.
+
+    One incremental decoder per stream, so a character split across chunks
+    stays intact and invalid UTF-8 is replaced rather than raising.
+    """
+    if writer is None:
+        return lambda data_b64: None
+
+    decode = codecs.getincrementaldecoder("utf-8")(errors="replace").decode
+    flush = getattr(writer, "flush", None)
+    if not callable(flush):
+        flush = None
+
+    def write_text(data_b64: str) -> None:
+        try:
+            text = decode(b64decode(data_b64))
+        except Exception:
+            return
+        writer.write(text)
+        if flush is not None:
+            flush()
+
+    return write_text
+
+
+class _Completion:
+    """One-shot event backed by a single pre-acquired lock.
+
+    ``threading.Event`` wraps a Condition and allocates a waiter lock per
+    wait(); a request completes exactly once, so one lock that set()
+    releases is enough.
+    """
+
+    __slots__ = ("_lock", "_set")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._lock.acquire()
+        self._set = False
+
+    def is_set(self) -> bool:
+        return self._set
+
+    def set(self) -> None:
+        if self._set:
+            return
+        self._set = True
+        self._lock.release()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        if self._set:
+            return True
+        if self._lock.acquire(timeout=-1 if timeout is None else timeout):
+            # Pass the wakeup on to any other waiter.
+            self._lock.release()
+            return True
+        return self._set
+
+
+class _DaemonWorkerPool:
+    """Thread pool for user callbacks whose workers are daemon threads.
+
+    ``ThreadPoolExecutor`` joins its workers at interpreter exit, so a
+    callback that never returns would hang process shutdown. Workers start
+    on demand up to ``max_workers`` (unbounded when None) and are reused
+    while idle.
+    """
+
+    __slots__ = (
+        "_idle",
+        "_lock",
+        "_max_workers",
+        "_name",
+        "_shutdown",
+        "_tasks",
+        "_workers",
+    )
+
+    def __init__(self, name: str, max_workers: int | None) -> None:
+        self._name = name
+        self._max_workers = max_workers
+        self._tasks: queue.SimpleQueue[
+            tuple[Callable[..., None], tuple[Any, ...]] | None
+        ] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._workers = 0
+        self._idle = 0
+        self._shutdown = False
+
+    def submit(self, fn: Callable[..., None], *args: Any) -> None:
+        """Queue ``fn(*args)``; raises RuntimeError once shut down."""
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit after shutdown")
+            if self._idle:
+                self._idle -= 1
+            elif self._max_workers is None or self._workers < self._max_workers:
+                self._workers += 1
+                threading.Thread(
+                    target=self._worker,
+                    name=f"{self._name}-{self._workers}",
+                    daemon=True,
+                ).start()
+            self._tasks.put((fn, args))
+
+    def shutdown(self) -> None:
+        """Drop queued tasks and let idle workers exit without waiting."""
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            while True:
+                try:
+                    self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+            for _ in range(self._workers):
+                self._tasks.put(None)
+
+    def _worker(self) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            fn, args = task
+            del task
+            try:
+                fn(*args)
+            except BaseException:
+                # Let the thread die and report it like any other thread;
+                # the next submit() starts a replacement.
+                with self._lock:
+                    self._workers -= 1
+                raise
+            del fn, args
+            with self._lock:
+                self._idle += 1
+
+
+class _WriteBatch:
+    """Frames queued for one group-commit write, and how that write failed."""
+
+    __slots__ = ("error", "frames")
+
+    def __init__(self) -> None:
+        self.frames: list[bytes] = []
+        self.error: BaseException | None = None
+
 
 class _PendingRequest:
     __slots__ = ("event", "result", "error", "on_notification")
@@ -63,14 +426,14 @@ class _PendingRequest:
         self,
         on_notification: Callable[[str, dict[str, Any]], None] | None = None,
     ) -> None:
-        self.event = threading.Event()
+        self.event = _Completion()
         self.result: Any = None
         self.error: Exception | None = None
         self.on_notification = on_notification
 
 
 class _LocalVFSHook:
-    __slots__ = ("name", "ops", "path", "timeout_ms", "dangerous", "hook")
+    __slots__ = ("name", "ops", "path", "path_match", "timeout_ms", "dangerous", "hook")
 
     def __init__(
         self,
@@ -84,13 +447,14 @@ class _LocalVFSHook:
         self.name = name
         self.ops = ops
         self.path = path
+        self.path_match = _compile_path_matcher(path)
         self.timeout_ms = timeout_ms
         self.dangerous = dangerous
         self.hook = hook
 
 
 class _LocalVFSMutateHook:
-    __slots__ = ("name", "ops", "path", "hook")
+    __slots__ = ("name", "ops", "path", "path_match", "hook")
 
     def __init__(
         self,
@@ -102,11 +466,12 @@ class _LocalVFSMutateHook:
         self.name = name
         self.ops = ops
         self.path = path
+        self.path_match = _compile_path_matcher(path)
         self.hook = hook
 
 
 class _LocalVFSActionHook:
-    __slots__ = ("name", "ops", "path", "hook")
+    __slots__ = ("name", "ops", "path", "path_match", "hook")
 
     def __init__(
         self,
@@ -118,6 +483,7 @@ class _LocalVFSActionHook:
         self.name = name
         self.ops = ops
         self.path = path
+        self.path_match = _compile_path_matcher(path)
         self.hook = hook
 
 
@@ -150,29 +516,43 @@ class Client:
             )
 
         self._config = config
-        self._process: subprocess.Popen[str] | None = None
-        self._request_id = 0
-        self._id_lock = threading.Lock()
+        self._process: subprocess.Popen[bytes] | None = None
+        self._transport_sock: socket.socket | None = None
+        # next() on a count is atomic under the GIL, so ids need no lock.
+        self._request_ids = itertools.count(1)
         self._vm_id: str | None = None
 
         self._write_lock = threading.Lock()
-        self._pending_lock = threading.Lock()
+        self._write_batch_lock = threading.Lock()
+        self._write_batch = _WriteBatch()
+        # Registered, resolved and drained without a lock; see _reader_loop.
         self._pending: dict[int, _PendingRequest] = {}
         self._reader_thread: threading.Thread | None = None
         self._closed = False
         self._last_vm_id: str | None = None
 
-        self._vfs_hooks: list[_LocalVFSHook] = []
-        self._vfs_mutate_hooks: list[_LocalVFSMutateHook] = []
-        self._vfs_action_hooks: list[_LocalVFSActionHook] = []
+        # Hook collections are immutable snapshots swapped in under
+        # _vfs_hook_lock / _network_hook_lock; readers load them lock-free.
+        self._vfs_hooks: tuple[_LocalVFSHook, ...] = ()
+        self._vfs_mutate_hooks: tuple[_LocalVFSMutateHook, ...] = ()
+        self._vfs_action_hooks: tuple[_LocalVFSActionHook, ...] = ()
         self._vfs_hook_active = False
         self._vfs_hook_lock = threading.Lock()
+        self._refresh_ids()
+        # Event callbacks run here rather than on a thread per event; workers
+        # are only started once hooks actually fire.
+        self._vfs_hook_pool = _DaemonWorkerPool(
+            "matchlock-vfs-hook", max_workers=_VFS_HOOK_WORKERS
+        )
 
         self._network_hook_lock = threading.Lock()
         self._network_hooks: dict[str, _LocalNetworkHook] = {}
         self._network_hook_socket = ""
         self._network_hook_listener: socket.socket | None = None
         self._network_hook_temp_dir = ""
+        self._network_hook_pool = _DaemonWorkerPool(
+            "matchlock-network-hook", max_workers=_NETWORK_HOOK_WORKERS
+        )
 
     def __enter__(self) -> "Client":
         self.start()
@@ -190,21 +570,61 @@ class Client:
             return
 
         cmd = [self._config.binary_path, "rpc"]
-        if self._config.use_sudo:
+        # Already root: sudo would only add PAM/audit startup latency.
+        if self._config.use_sudo and self._euid != 0:
             cmd = ["sudo"] + cmd
 
-        self._process = subprocess.Popen(
-            cmd,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True,
-            bufsize=1,
-        )
+        if self._config.use_socketpair:
+            self._process = self._spawn_over_socketpair(cmd)
+        else:
+            self._process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=_RAW_WRITE_THRESHOLD,
+            )
 
         self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
         self._reader_thread.start()
 
+    def _spawn_over_socketpair(self, cmd: list[str]) -> subprocess.Popen[bytes]:
+        """Spawn matchlock with one end of a socketpair as its stdin/stdout.
+
+        The child end is shared by both fds; our end is wrapped in buffered
+        files and exposed as ``stdin``/``stdout`` so the rest of the client
+        is transport-agnostic.
+        """
+        ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            for opt in (socket.SO_SNDBUF, socket.SO_RCVBUF):
+                for sock in (ours, theirs):
+                    sock.setsockopt(socket.SOL_SOCKET, opt, _SOCKET_BUFFER_SIZE)
+            process = subprocess.Popen(
+                cmd,
+                stdin=theirs.fileno(),
+                stdout=theirs.fileno(),
+                stderr=subprocess.DEVNULL,
+            )
+        except BaseException:
+            ours.close()
+            raise
+        finally:
+            theirs.close()
+
+        # makefile() is only typed precisely for the default buffer size.
+        process.stdin = cast(
+            IO[bytes], ours.makefile("wb", buffering=_RAW_WRITE_THRESHOLD)
+        )
+        process.stdout = ours.makefile("rb")
+        self._transport_sock = ours
+        return process
+
+    def _close_transport_socket(self) -> None:
+        sock, self._transport_sock = self._transport_sock, None
+        if sock is not None:
+            sock.close()
+
     def close(self, timeout: float = 0) -> None:
         """Close the sandbox and clean up resources.
 
@@ -218,9 +638,12 @@ class Client:
         self._closed = True
         self._last_vm_id = self._vm_id
         self._set_local_vfs_hooks([], [], [])
+        self._vfs_hook_pool.shutdown()
         self._stop_network_hook_server()
+        self._network_hook_pool.shutdown()
 
         if self._process is None or self._process.poll() is not None:
+            self._close_transport_socket()
             return
 
         effective_timeout = timeout if timeout and timeout > 0 else 2.0
@@ -237,17 +660,21 @@ class Client:
         try:
             assert self._process.stdin is not None
             self._process.stdin.close()
+            if self._transport_sock is not None:
+                # Closing the makefile() wrapper does not send EOF.
+                self._transport_sock.shutdown(socket.SHUT_WR)
         except Exception:
             pass
 
         try:
-            self._process.wait(timeout=effective_timeout)
+            _wait_for_exit(self._process, effective_timeout)
         except Exception:
             try:
                 self._process.kill()
                 self._process.wait(timeout=1)
             except Exception:
                 pass
+        self._close_transport_socket()
 
     def remove(self) -> None:
         """Remove the stopped VM state directory.
@@ -289,7 +716,7 @@ class Client:
         )
 
         try:
-            payload = json.loads(result.stdout)
+            payload = _json_loads(result.stdout)
         except json.JSONDecodeError as e:
             raise MatchlockError(f"failed to parse volume create output: {e}") from e
 
@@ -311,7 +738,7 @@ class Client:
         )
 
         try:
-            payload = json.loads(result.stdout)
+            payload = _json_loads(result.stdout)
         except json.JSONDecodeError as e:
             raise MatchlockError(f"failed to parse volume list output: {e}") from e
         if not isinstance(payload, list):
@@ -355,48 +782,98 @@ class Client:
 
     # ── Reader loop ──────────────────────────────────────────────────
 
-    def _reader_loop(self) -> None:
-        assert self._process is not None
-        assert self._process.stdout is not None
-        stdout = self._process.stdout
+    @staticmethod
+    def _iter_lines(stdout: IO[bytes]) -> Iterator[bytes | bytearray]:
+        """Yield newline-delimited frames from the server until EOF.
+
+        Reads the fd in large chunks and splits them in place, so a burst
+        of small notifications costs one read() instead of one readline()
+        each. Streams without a real fd fall back to readline().
+        """
+        try:
+            fd = stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            yield from iter(stdout.readline, b"")
+            return
 
+        buf = bytearray()
         while True:
-            line = stdout.readline()
-            if not line:
-                with self._pending_lock:
-                    err = MatchlockError("Matchlock process closed unexpectedly")
-                    for p in self._pending.values():
-                        p.error = err
-                        p.event.set()
-                    self._pending.clear()
-                self._stop_network_hook_server()
+            chunk = os.read(fd, _READ_CHUNK_SIZE)
+            if not chunk:
                 return
+            # Only scan the new bytes: earlier ones are known newline-free.
+            scan = len(buf)
+            buf += chunk
+            start = 0
+            while (nl := buf.find(b"\n", scan)) >= 0:
+                yield buf[start:nl]
+                start = scan = nl + 1
+            if start:
+                del buf[:start]
+
+    def _reader_loop(self) -> None:
+        assert self._process is not None
+        assert self._process.stdout is not None
+        # Bound once: this loop runs for every message the server sends.
+        # _pending takes no lock: single get/set/pop calls are atomic, and
+        # the fail-all below drains it key by key rather than iterating.
+        pending_get = self._pending.get
+        pending_pop = self._pending.pop
+        loads = _json_loads
+        stream_methods = _STREAM_NOTIFICATION_METHODS
+
+        for line in self._iter_lines(self._process.stdout):
+            # File events are only consumed by local VFS hooks; skip parsing
+            # them entirely when none are registered.
+            if not self._vfs_hooks and line.startswith(_EVENT_NOTIFICATION_PREFIX):
+                continue
 
             try:
-                msg = json.loads(line)
-            except json.JSONDecodeError:
+                msg = loads(line)
+            except ValueError:
                 continue
 
             msg_id = msg.get("id")
 
             if msg_id is None:
-                self._handle_notification(msg)
+                # Stream chunks are the hot path: dispatch them inline and
+                # leave events and unknown methods to _handle_notification.
+                method = msg.get("method")
+                if method in stream_methods:
+                    params = msg.get("params") or {}
+                    req_id = params.get("id")
+                    if req_id is None:
+                        continue
+                    pending = pending_get(req_id)
+                    if pending is not None and pending.on_notification is not None:
+                        pending.on_notification(method, params)
+                else:
+                    self._handle_notification(msg)
                 continue
 
-            with self._pending_lock:
-                pending = self._pending.get(msg_id)
+            # The response is the request's last message, so reap it here;
+            # the caller's own pop only matters after a timeout.
+            pending = pending_pop(msg_id, None)
 
             if pending is None:
                 continue
 
-            if msg.get("error"):
-                err_data = msg["error"]
+            err_data = msg.get("error")
+            if err_data:
                 pending.error = RPCError(err_data["code"], err_data["message"])
             else:
                 pending.result = msg.get("result")
 
             pending.event.set()
 
+        err = MatchlockError("Matchlock process closed unexpectedly")
+        for req_id in list(self._pending):
+            p = self._pending.pop(req_id, None)
+            if p is not None:
+                p.error = err
+                p.event.set()
+        self._stop_network_hook_server()
+
     def _handle_notification(self, msg: dict[str, Any]) -> None:
         method = msg.get("method", "")
         if method == "event":
@@ -404,16 +881,7 @@ class Client:
             self._handle_event_notification(params)
             return
 
-        if method not in (
-            "exec_stream.stdout",
-            "exec_stream.stderr",
-            "exec_pipe.ready",
-            "exec_pipe.stdout",
-            "exec_pipe.stderr",
-            "exec_tty.ready",
-            "exec_tty.stdout",
-            "log_stream.data",
-        ):
+        if method not in _STREAM_NOTIFICATION_METHODS:
             return
 
         params = msg.get("params", {})
@@ -421,13 +889,15 @@ class Client:
         if req_id is None:
             return
 
-        with self._pending_lock:
-            pending = self._pending.get(req_id)
-
+        pending = self._pending.get(req_id)
         if pending is not None and pending.on_notification is not None:
             pending.on_notification(method, params)
 
     def _handle_event_notification(self, params: dict[str, Any]) -> None:
+        # File events only feed event hooks; mutate/action hooks run locally
+        # on the calling thread and never see them.
+        if not self._vfs_hooks:
+            return
         file_event = params.get("file")
         if not isinstance(file_event, dict):
             return
@@ -444,9 +914,7 @@ class Client:
     def _handle_vfs_file_event(
         self, op: str, path: str, size: int, mode: int, uid: int, gid: int
     ) -> None:
-        with self._vfs_hook_lock:
-            hooks = list(self._vfs_hooks)
-            active = self._vfs_hook_active
+        hooks = self._vfs_hooks
         if not hooks:
             return
 
@@ -456,36 +924,42 @@ class Client:
         for hook in hooks:
             if hook.ops and op not in hook.ops:
                 continue
-            if hook.path and not fnmatch.fnmatch(path, hook.path):
+            if hook.path_match is not None and not hook.path_match(path):
                 continue
             if hook.dangerous:
-                t = threading.Thread(
-                    target=self._run_single_vfs_hook, args=(hook, event), daemon=True
-                )
-                t.start()
+                self._submit_vfs_hook_task(self._run_single_vfs_hook, hook, event)
                 continue
             safe_hooks.append(hook)
 
         if not safe_hooks:
             return
-        if active:
-            return
 
-        t = threading.Thread(
-            target=self._run_vfs_safe_hooks_for_event,
-            args=(safe_hooks, event),
-            daemon=True,
-        )
-        t.start()
-
-    def _run_vfs_safe_hooks_for_event(
-        self, hooks: list[_LocalVFSHook], event: VFSHookEvent
-    ) -> None:
+        # One safe-hook run at a time: the slot is claimed here, so events
+        # arriving while a run is queued or in progress are dropped rather
+        # than each costing a pool task. This also keeps hooks that touch
+        # files from re-triggering themselves.
         with self._vfs_hook_lock:
             if self._vfs_hook_active:
                 return
             self._vfs_hook_active = True
+        if not self._submit_vfs_hook_task(
+            self._run_vfs_safe_hooks_for_event, safe_hooks, event
+        ):
+            with self._vfs_hook_lock:
+                self._vfs_hook_active = False
 
+    def _submit_vfs_hook_task(self, fn: Callable[..., None], *args: Any) -> bool:
+        try:
+            self._vfs_hook_pool.submit(fn, *args)
+        except RuntimeError:
+            # Pool already shut down by close(); the client is going away.
+            return False
+        return True
+
+    def _run_vfs_safe_hooks_for_event(
+        self, hooks: list[_LocalVFSHook], event: VFSHookEvent
+    ) -> None:
+        # _handle_vfs_file_event already claimed _vfs_hook_active.
         try:
             for hook in hooks:
                 self._run_single_vfs_hook(hook, event)
@@ -505,22 +979,18 @@ class Client:
     def _apply_local_write_mutations(
         self, path: str, content: bytes, mode: int
     ) -> bytes:
-        with self._vfs_hook_lock:
-            hooks = list(self._vfs_mutate_hooks)
-
+        hooks = self._vfs_mutate_hooks
         if not hooks:
             return content
 
-        uid_fn = getattr(os, "geteuid", None)
-        gid_fn = getattr(os, "getegid", None)
-        uid = int(uid_fn()) if callable(uid_fn) else 0
-        gid = int(gid_fn()) if callable(gid_fn) else 0
+        uid = self._euid
+        gid = self._egid
 
         current = content
         for hook in hooks:
             if hook.ops and "write" not in hook.ops:
                 continue
-            if hook.path and not fnmatch.fnmatch(path, hook.path):
+            if hook.path_match is not None and not hook.path_match(path):
                 continue
 
             request = VFSMutateRequest(
@@ -543,26 +1013,27 @@ class Client:
     def _apply_local_action_hooks(
         self, op: str, path: str, size: int, mode: int
     ) -> None:
-        with self._vfs_hook_lock:
-            hooks = list(self._vfs_action_hooks)
-
+        hooks = self._vfs_action_hooks
         if not hooks:
             return
 
-        uid_fn = getattr(os, "geteuid", None)
-        gid_fn = getattr(os, "getegid", None)
-        uid = int(uid_fn()) if callable(uid_fn) else 0
-        gid = int(gid_fn()) if callable(gid_fn) else 0
+        uid = self._euid
+        gid = self._egid
 
         req = VFSActionRequest(op=op, path=path, size=size, mode=mode, uid=uid, gid=gid)
         for hook in hooks:
             if hook.ops and op not in hook.ops:
                 continue
-            if hook.path and not fnmatch.fnmatch(path, hook.path):
+            if hook.path_match is not None and not hook.path_match(path):
                 continue
 
-            decision = str(hook.hook(req)).strip().lower()
-            if decision in ("", VFS_HOOK_ACTION_ALLOW):
+            raw = hook.hook(req)
+            # Hooks almost always return the canonical constant; skip
+            # normalising it.
+            if isinstance(raw, str) and raw in _VFS_ALLOW_DECISIONS:
+                continue
+            decision = str(raw).strip().lower()
+            if decision in _VFS_ALLOW_DECISIONS:
                 continue
             if decision == VFS_HOOK_ACTION_BLOCK:
                 raise MatchlockError(
@@ -573,16 +1044,26 @@ class Client:
                 f"{VFS_HOOK_ACTION_ALLOW!r}|{VFS_HOOK_ACTION_BLOCK!r}, got {decision!r}"
             )
 
+    def _refresh_ids(self) -> None:
+        """Cache the effective uid/gid reported to local VFS hooks.
+
+        Call again after deliberately changing process credentials.
+        """
+        uid_fn = getattr(os, "geteuid", None)
+        gid_fn = getattr(os, "getegid", None)
+        self._euid = int(uid_fn()) if callable(uid_fn) else 0
+        self._egid = int(gid_fn()) if callable(gid_fn) else 0
+
     def _set_local_vfs_hooks(
         self,
-        hooks: list[_LocalVFSHook],
-        mutate_hooks: list[_LocalVFSMutateHook],
-        action_hooks: list[_LocalVFSActionHook],
+        hooks: Iterable[_LocalVFSHook],
+        mutate_hooks: Iterable[_LocalVFSMutateHook],
+        action_hooks: Iterable[_LocalVFSActionHook],
     ) -> None:
         with self._vfs_hook_lock:
-            self._vfs_hooks = hooks
-            self._vfs_mutate_hooks = mutate_hooks
-            self._vfs_action_hooks = action_hooks
+            self._vfs_hooks = tuple(hooks)
+            self._vfs_mutate_hooks = tuple(mutate_hooks)
+            self._vfs_action_hooks = tuple(action_hooks)
             self._vfs_hook_active = False
 
     def _compile_vfs_hooks(
@@ -606,24 +1087,22 @@ class Client:
 
         for rule in cfg.rules:
             callbacks = [
-                rule.hook,
-                rule.dangerous_hook,
-                rule.mutate_hook,
-                rule.action_hook,
+                (kind, cb)
+                for kind, cb in (
+                    ("hook", rule.hook),
+                    ("dangerous_hook", rule.dangerous_hook),
+                    ("mutate_hook", rule.mutate_hook),
+                    ("action_hook", rule.action_hook),
+                )
+                if cb is not None
             ]
-            callback_count = sum(1 for cb in callbacks if cb is not None)
-            if callback_count > 1:
+            if len(callbacks) > 1:
                 raise MatchlockError(
                     f"invalid vfs hook {rule.name!r}: cannot set more than one callback hook"
                 )
 
-            if (
-                rule.hook is None
-                and rule.dangerous_hook is None
-                and rule.mutate_hook is None
-                and rule.action_hook is None
-            ):
-                action = (rule.action or "").strip().lower()
+            action = (rule.action or "").strip().lower()
+            if not callbacks:
                 if action == "mutate_write":
                     raise MatchlockError(
                         f"invalid vfs hook {rule.name!r}: mutate_write requires mutate_hook callback"
@@ -631,94 +1110,47 @@ class Client:
                 wire.rules.append(rule)
                 continue
 
-            if rule.hook is not None:
-                action = (rule.action or "").strip().lower()
-                if action not in ("", VFS_HOOK_ACTION_ALLOW):
-                    raise MatchlockError(
-                        f"invalid vfs hook {rule.name!r}: callback hooks cannot set action={rule.action!r}"
-                    )
-                if rule.phase.lower() != VFS_HOOK_PHASE_AFTER:
-                    raise MatchlockError(
-                        f"invalid vfs hook {rule.name!r}: callback hooks must use phase=after"
-                    )
-
-                ops = {op.lower() for op in rule.ops if op}
-                local.append(
-                    _LocalVFSHook(
-                        name=rule.name,
-                        ops=ops,
-                        path=rule.path,
-                        timeout_ms=rule.timeout_ms,
-                        dangerous=False,
-                        hook=rule.hook,
-                    )
+            kind, callback = callbacks[0]
+            label, required_phase, phase_optional = _VFS_CALLBACK_RULES[kind]
+            if action not in _VFS_ALLOW_DECISIONS:
+                raise MatchlockError(
+                    f"invalid vfs hook {rule.name!r}: {label} cannot set action={rule.action!r}"
+                )
+            phase = (rule.phase or "").lower()
+            if (phase or not phase_optional) and phase != required_phase:
+                raise MatchlockError(
+                    f"invalid vfs hook {rule.name!r}: {label} must use phase={required_phase}"
                 )
-                continue
 
-            if rule.dangerous_hook is not None:
-                action = (rule.action or "").strip().lower()
-                if action not in ("", VFS_HOOK_ACTION_ALLOW):
-                    raise MatchlockError(
-                        f"invalid vfs hook {rule.name!r}: dangerous_hook cannot set action={rule.action!r}"
+            ops = {op.lower() for op in rule.ops if op}
+            if kind == "mutate_hook":
+                # Read the typed field rather than the kind-erased callback.
+                mutate_hook = rule.mutate_hook
+                assert mutate_hook is not None
+                local_mutate.append(
+                    _LocalVFSMutateHook(
+                        name=rule.name, ops=ops, path=rule.path, hook=mutate_hook
                     )
-                if rule.phase.lower() != VFS_HOOK_PHASE_AFTER:
-                    raise MatchlockError(
-                        f"invalid vfs hook {rule.name!r}: dangerous_hook must use phase=after"
+                )
+            elif kind == "action_hook":
+                action_hook = rule.action_hook
+                assert action_hook is not None
+                local_action.append(
+                    _LocalVFSActionHook(
+                        name=rule.name, ops=ops, path=rule.path, hook=action_hook
                     )
-
-                ops = {op.lower() for op in rule.ops if op}
+                )
+            else:
                 local.append(
                     _LocalVFSHook(
                         name=rule.name,
                         ops=ops,
                         path=rule.path,
                         timeout_ms=rule.timeout_ms,
-                        dangerous=True,
-                        hook=rule.dangerous_hook,
-                    )
-                )
-                continue
-
-            if rule.action_hook is not None:
-                action = (rule.action or "").strip().lower()
-                if action not in ("", VFS_HOOK_ACTION_ALLOW):
-                    raise MatchlockError(
-                        f"invalid vfs hook {rule.name!r}: action_hook cannot set action={rule.action!r}"
+                        dangerous=kind == "dangerous_hook",
+                        hook=callback,
                     )
-                if rule.phase and rule.phase.lower() != VFS_HOOK_PHASE_BEFORE:
-                    raise MatchlockError(
-                        f"invalid vfs hook {rule.name!r}: action_hook must use phase=before"
-                    )
-                ops = {op.lower() for op in rule.ops if op}
-                local_action.append(
-                    _LocalVFSActionHook(
-                        name=rule.name,
-                        ops=ops,
-                        path=rule.path,
-                        hook=rule.action_hook,
-                    )
-                )
-                continue
-
-            action = (rule.action or "").strip().lower()
-            if action not in ("", VFS_HOOK_ACTION_ALLOW):
-                raise MatchlockError(
-                    f"invalid vfs hook {rule.name!r}: mutate_hook cannot set action={rule.action!r}"
-                )
-            if rule.phase and rule.phase.lower() != VFS_HOOK_PHASE_BEFORE:
-                raise MatchlockError(
-                    f"invalid vfs hook {rule.name!r}: mutate_hook must use phase=before"
                 )
-            assert rule.mutate_hook is not None
-            ops = {op.lower() for op in rule.ops if op}
-            local_mutate.append(
-                _LocalVFSMutateHook(
-                    name=rule.name,
-                    ops=ops,
-                    path=rule.path,
-                    hook=rule.mutate_hook,
-                )
-            )
 
         if local:
             wire.emit_events = True
@@ -739,7 +1171,7 @@ class Client:
             wire_rule = rule.to_dict()
             if rule.hook is not None:
                 action = (rule.action or "").strip().lower()
-                if action not in ("", NETWORK_HOOK_ACTION_ALLOW):
+                if action not in _NETWORK_ALLOW_ACTIONS:
                     raise MatchlockError(
                         f"invalid network hook {rule.name!r}: callback hooks cannot set "
                         f"action={rule.action!r}"
@@ -766,7 +1198,10 @@ class Client:
         listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         try:
             listener.bind(socket_path)
-            listener.listen()
+            # The server dials one connection per callback and a non-blocking
+            # unix connect fails with EAGAIN once the backlog is full, so take
+            # the kernel maximum rather than Python's default of 128.
+            listener.listen(socket.SOMAXCONN)
         except Exception:
             listener.close()
             shutil.rmtree(temp_dir, ignore_errors=True)
@@ -802,30 +1237,93 @@ class Client:
             shutil.rmtree(temp_dir, ignore_errors=True)
 
     def _network_hook_accept_loop(self, listener: socket.socket) -> None:
-        while True:
-            try:
-                conn, _ = listener.accept()
-            except OSError:
-                return
-            t = threading.Thread(
-                target=self._serve_network_hook_conn, args=(conn,), daemon=True
-            )
-            t.start()
+        """Accept callback connections and read their requests on one thread.
 
-    def _serve_network_hook_conn(self, conn: socket.socket) -> None:
-        with conn:
-            try:
-                reader = conn.makefile("r", encoding="utf-8")
-                line = reader.readline()
-            except Exception as e:
-                self._write_network_hook_response(conn, {"error": str(e)})
-                return
+        Sockets are multiplexed with a selector (epoll on Linux); only
+        complete requests are handed to _network_hook_pool, so a peer that
+        never finishes its request holds a buffer here rather than a worker.
+        """
+        listener.setblocking(False)
+        # Partially read requests and the monotonic deadline for each.
+        pending: dict[socket.socket, tuple[bytearray, float]] = {}
+        chunk = memoryview(bytearray(_HOOK_RECV_SIZE))
+        sel = selectors.DefaultSelector()
+        try:
+            sel.register(listener, selectors.EVENT_READ)
+            # close() on the listener does not wake select(), so poll for it.
+            while listener.fileno() >= 0:
+                now = time.monotonic()
+                wait = _PROCESS_POLL_INTERVAL
+                for conn, (_, deadline) in list(pending.items()):
+                    if deadline <= now:
+                        sel.unregister(conn)
+                        del pending[conn]
+                        with conn:
+                            self._write_network_hook_response(
+                                conn,
+                                {"error": "timed out reading network hook request"},
+                            )
+                    else:
+                        wait = min(wait, deadline - now)
+
+                for key, _ in sel.select(wait):
+                    if key.fileobj is listener:
+                        try:
+                            conn, _ = listener.accept()
+                        except BlockingIOError:
+                            continue
+                        except OSError:
+                            return
+                        conn.setblocking(False)
+                        sel.register(conn, selectors.EVENT_READ)
+                        pending[conn] = (
+                            bytearray(),
+                            time.monotonic() + _NETWORK_HOOK_READ_TIMEOUT,
+                        )
+                        continue
+
+                    conn = cast(socket.socket, key.fileobj)
+                    buf, _ = pending[conn]
+                    try:
+                        n = conn.recv_into(chunk)
+                    except BlockingIOError:
+                        continue
+                    except OSError:
+                        n = 0
+                        buf.clear()
+                    if n:
+                        start = len(buf)
+                        buf += chunk[:n]
+                        nl = buf.find(b"\n", start)
+                        if nl < 0:
+                            continue
+                        del buf[nl:]
+
+                    # A full line, or EOF with whatever preceded it.
+                    sel.unregister(conn)
+                    del pending[conn]
+                    conn.setblocking(True)
+                    try:
+                        self._network_hook_pool.submit(
+                            self._serve_network_hook_conn, conn, buf
+                        )
+                    except RuntimeError:
+                        # Pool already shut down by close(); the client is
+                        # going away.
+                        conn.close()
+                        return
+        finally:
+            sel.close()
+            for conn in pending:
+                conn.close()
 
+    def _serve_network_hook_conn(self, conn: socket.socket, line: bytearray) -> None:
+        with conn:
             if not line:
                 return
 
             try:
-                payload = json.loads(line)
+                payload = _json_loads(line)
                 if not isinstance(payload, dict):
                     raise ValueError("network hook callback request must be an object")
             except Exception as e:
@@ -833,17 +1331,12 @@ class Client:
                 return
 
             callback_id = str(payload.get("callback_id", "")).strip()
-            phase_raw = str(payload.get("phase", "")).strip().lower()
-            phase: NetworkHookPhase
-            if phase_raw == "before":
-                phase = "before"
-            elif phase_raw == "after":
-                phase = "after"
-            else:
-                phase = ""
+            phase_raw = str(payload.get("phase", ""))
+            phase: NetworkHookPhase = _NETWORK_HOOK_PHASES.get(phase_raw) or (
+                _NETWORK_HOOK_PHASES.get(phase_raw.strip().lower(), "")
+            )
 
-            with self._network_hook_lock:
-                hook = self._network_hooks.get(callback_id)
+            hook = self._network_hooks.get(callback_id)
             if hook is None:
                 self._write_network_hook_response(
                     conn, {"error": "network hook callback not found"}
@@ -860,14 +1353,10 @@ class Client:
                 host=str(payload.get("host", "")),
                 method=str(payload.get("method", "")),
                 path=str(payload.get("path", "")),
-                query=self._to_string_map(payload.get("query")),
-                request_headers=self._to_string_slice_map(
-                    payload.get("request_headers")
-                ),
+                query=_to_string_map(payload.get("query")),
+                request_headers=_to_string_slice_map(payload.get("request_headers")),
                 status_code=int(payload.get("status_code") or 0),
-                response_headers=self._to_string_slice_map(
-                    payload.get("response_headers")
-                ),
+                response_headers=_to_string_slice_map(payload.get("response_headers")),
                 is_sse=bool(payload.get("is_sse")),
             )
 
@@ -898,11 +1387,9 @@ class Client:
         if result.request is not None:
             request: dict[str, Any] = {}
             if result.request.headers is not None:
-                request["headers"] = self._clone_string_slice_map(
-                    result.request.headers
-                )
+                request["headers"] = _clone_string_slice_map(result.request.headers)
             if result.request.query is not None:
-                request["query"] = self._clone_string_map(result.request.query)
+                request["query"] = _clone_string_map(result.request.query)
             if result.request.path:
                 request["path"] = result.request.path
             if request:
@@ -911,9 +1398,7 @@ class Client:
         if result.response is not None:
             response: dict[str, Any] = {}
             if result.response.headers is not None:
-                response["headers"] = self._clone_string_slice_map(
-                    result.response.headers
-                )
+                response["headers"] = _clone_string_slice_map(result.response.headers)
             if result.response.body_replacements:
                 response["body_replacements"] = [
                     x.to_dict() for x in result.response.body_replacements
@@ -926,7 +1411,7 @@ class Client:
                     raise MatchlockError(
                         "invalid network hook response set_body type: expected bytes|str|None"
                     )
-                response["set_body_base64"] = base64.b64encode(body).decode("ascii")
+                response["set_body_base64"] = b64encode(body).decode("ascii")
             if response:
                 resp["response"] = response
 
@@ -936,44 +1421,67 @@ class Client:
         self, conn: socket.socket, payload: dict[str, Any]
     ) -> None:
         try:
-            data = json.dumps(payload) + "\n"
-            conn.sendall(data.encode("utf-8"))
+            # The newline is appended by the encoder, so large set_body
+            # responses are not copied a second time before the send.
+            conn.sendall(_json_dumps_line(payload))
         except Exception:
             pass
 
-    def _to_string_map(self, value: Any) -> dict[str, str] | None:
-        if not isinstance(value, dict):
-            return None
-        out: dict[str, str] = {}
-        for k, v in value.items():
-            out[str(k)] = str(v)
-        return out
+    # ── RPC transport ────────────────────────────────────────────────
 
-    def _to_string_slice_map(self, value: Any) -> dict[str, list[str]] | None:
-        if not isinstance(value, dict):
-            return None
-        out: dict[str, list[str]] = {}
-        for k, v in value.items():
-            if isinstance(v, list):
-                out[str(k)] = [str(x) for x in v]
-            else:
-                out[str(k)] = [str(v)]
-        return out
+    def _next_id(self) -> int:
+        return next(self._request_ids)
 
-    def _clone_string_map(self, value: dict[str, str]) -> dict[str, str]:
-        return {str(k): str(v) for k, v in value.items()}
+    def _write(self, data: bytes) -> None:
+        """Write one or more framed requests to the server.
 
-    def _clone_string_slice_map(
-        self, value: dict[str, list[str]]
-    ) -> dict[str, list[str]]:
-        return {str(k): [str(x) for x in v] for k, v in value.items()}
+        Frames are queued and written group-commit style: whichever caller
+        holds ``_write_lock`` drains every frame queued so far in a single
+        write and flush, so concurrent callers share one syscall.
 
-    # ── RPC transport ────────────────────────────────────────────────
+        Large payloads bypass the BufferedWriter and go to the fd directly,
+        saving a copy into its internal buffer.
+        """
+        with self._write_batch_lock:
+            batch = self._write_batch
+            batch.frames.append(data)
+        with self._write_lock:
+            with self._write_batch_lock:
+                drained = self._write_batch is not batch
+                if not drained:
+                    self._write_batch = _WriteBatch()
+            if drained:
+                # An earlier lock holder already wrote our frame, or failed to;
+                # every caller in the batch sees the same outcome.
+                if batch.error is not None:
+                    raise batch.error
+                return
+            frames = batch.frames
+            data = frames[0] if len(frames) == 1 else b"".join(frames)
+            try:
+                self._write_frames(data)
+            except BaseException as e:
+                batch.error = e
+                raise
 
-    def _next_id(self) -> int:
-        with self._id_lock:
-            self._request_id += 1
-            return self._request_id
+    def _write_frames(self, data: bytes) -> None:
+        """Write ``data`` to the server's stdin; caller holds _write_lock."""
+        assert self._process is not None
+        assert self._process.stdin is not None
+        stdin = self._process.stdin
+        if len(data) >= _RAW_WRITE_THRESHOLD:
+            try:
+                fd = stdin.fileno()
+            except (OSError, ValueError):
+                fd = -1
+            if fd >= 0:
+                stdin.flush()
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view) :]
+                return
+        stdin.write(data)
+        stdin.flush()
 
     def _send_request(
         self,
@@ -981,6 +1489,8 @@ class Client:
         params: dict[str, Any] | None = None,
         on_notification: Callable[[str, dict[str, Any]], None] | None = None,
         timeout: float | None = None,
+        *,
+        encoded_params: bytes | None = None,
     ) -> Any:
         """Send a JSON-RPC request and wait for the result.
 
@@ -991,6 +1501,9 @@ class Client:
             timeout: Optional timeout in seconds. If the request doesn't
                 complete within the timeout, a ``cancel`` RPC is sent and
                 :class:`TimeoutError` is raised.
+            encoded_params: Already-serialized JSON object sent verbatim in
+                place of ``params``. Lets bulk payloads skip a second
+                serialization pass.
         """
         if self._process is None or self._process.poll() is not None:
             raise MatchlockError("Matchlock process not running")
@@ -998,26 +1511,14 @@ class Client:
         req_id = self._next_id()
         pending = _PendingRequest(on_notification=on_notification)
 
-        with self._pending_lock:
-            self._pending[req_id] = pending
+        self._pending[req_id] = pending
 
         try:
-            request: dict[str, Any] = {
-                "jsonrpc": "2.0",
-                "method": method,
-                "id": req_id,
-            }
-            if params:
-                request["params"] = params
-
-            data = json.dumps(request) + "\n"
+            data = self._encode_request(method, req_id, params, encoded_params)
 
-            with self._write_lock:
-                assert self._process.stdin is not None
-                self._process.stdin.write(data)
-                self._process.stdin.flush()
+            self._write(data)
 
-            if not pending.event.wait(timeout=timeout):
+            if not self._wait_pending(pending, timeout):
                 self._send_cancel(req_id)
                 raise TimeoutError(
                     f"request {method} (id={req_id}) timed out after {timeout}s"
@@ -1028,47 +1529,131 @@ class Client:
 
             return pending.result
         finally:
-            with self._pending_lock:
+            self._pending.pop(req_id, None)
+
+    def _send_batch(
+        self,
+        calls: list[tuple[str, bytes]],
+        timeout: float | None = None,
+    ) -> list[Any]:
+        """Send several requests in one pipe write and wait for all results.
+
+        The server handles requests concurrently, so a batch costs roughly
+        one round trip instead of one per call.
+
+        Args:
+            calls: ``(method, encoded_params)`` pairs, sent in order.
+            timeout: Optional timeout in seconds for the whole batch. On
+                expiry the outstanding requests are cancelled and
+                :class:`TimeoutError` is raised.
+
+        Returns:
+            Results in the same order as ``calls``. If any request failed,
+            the first error is raised once every request has settled.
+        """
+        if self._process is None or self._process.poll() is not None:
+            raise MatchlockError("Matchlock process not running")
+        if not calls:
+            return []
+
+        batch: list[tuple[int, _PendingRequest]] = []
+        for _ in calls:
+            batch.append((self._next_id(), _PendingRequest()))
+        self._pending.update(batch)
+
+        try:
+            data = b"".join(
+                self._encode_request(method, req_id, None, encoded_params)
+                for (method, encoded_params), (req_id, _) in zip(calls, batch)
+            )
+
+            self._write(data)
+
+            deadline = None if timeout is None else time.monotonic() + timeout
+            for req_id, pending in batch:
+                remaining = (
+                    None if deadline is None else max(deadline - time.monotonic(), 0)
+                )
+                if not self._wait_pending(pending, remaining):
+                    for other_id, other in batch:
+                        if not other.event.is_set():
+                            self._send_cancel(other_id)
+                    raise TimeoutError(
+                        f"batch of {len(calls)} requests timed out after {timeout}s"
+                    )
+
+            for _, pending in batch:
+                if pending.error is not None:
+                    raise pending.error
+
+            return [pending.result for _, pending in batch]
+        finally:
+            for req_id, _ in batch:
                 self._pending.pop(req_id, None)
 
+    def _wait_pending(self, pending: _PendingRequest, timeout: float | None) -> bool:
+        """Wait for a response, failing fast if the server process exits.
+
+        The reader thread only notices a dead server once stdout hits EOF,
+        which never happens if something else (e.g. a sudo'd grandchild)
+        still holds the pipe open. Waiting in slices and polling the
+        process covers that case.
+
+        Returns False if ``timeout`` expires first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            slice_timeout = _PROCESS_POLL_INTERVAL
+            if deadline is not None:
+                slice_timeout = min(slice_timeout, max(deadline - time.monotonic(), 0))
+            if pending.event.wait(timeout=slice_timeout):
+                return True
+            process = self._process
+            if process is not None and process.poll() is not None:
+                # Give the reader a chance to drain a response written
+                # just before exit.
+                if pending.event.wait(timeout=_PROCESS_POLL_INTERVAL):
+                    return True
+                raise MatchlockError("Matchlock process exited")
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    @staticmethod
+    def _encode_request(
+        method: str,
+        req_id: int,
+        params: dict[str, Any] | None,
+        encoded_params: bytes | None = None,
+    ) -> bytes:
+        prefix = _request_prefixes.get(method)
+        if prefix is None:
+            prefix = b'{"jsonrpc":"2.0","method":%s,"id":' % _json_dumps(method)
+            _request_prefixes[method] = prefix
+        if encoded_params is None:
+            if not params:
+                return b"%s%d}\n" % (prefix, req_id)
+            encoded_params = _json_dumps(params)
+        return b'%s%d,"params":%s}\n' % (prefix, req_id, encoded_params)
+
     def _send_cancel(self, target_id: int) -> None:
         """Send a fire-and-forget cancel RPC for the given request ID."""
-        cancel_id = self._next_id()
-        request: dict[str, Any] = {
-            "jsonrpc": "2.0",
-            "method": "cancel",
-            "params": {"id": target_id},
-            "id": cancel_id,
-        }
-        data = json.dumps(request) + "\n"
+        data = _CANCEL_REQUEST % (self._next_id(), target_id)
         try:
-            with self._write_lock:
-                assert self._process is not None
-                assert self._process.stdin is not None
-                self._process.stdin.write(data)
-                self._process.stdin.flush()
+            self._write(data)
         except Exception:
             pass
 
     def _send_fire_and_forget(
-        self, method: str, params: dict[str, Any] | None = None
+        self,
+        method: str,
+        params: dict[str, Any] | None = None,
+        *,
+        encoded_params: bytes | None = None,
     ) -> None:
         req_id = self._next_id()
-        request: dict[str, Any] = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "id": req_id,
-        }
-        if params:
-            request["params"] = params
-
-        data = json.dumps(request) + "\n"
+        data = self._encode_request(method, req_id, params, encoded_params)
         try:
-            with self._write_lock:
-                assert self._process is not None
-                assert self._process.stdin is not None
-                self._process.stdin.write(data)
-                self._process.stdin.flush()
+            self._write(data)
         except Exception:
             pass
 
@@ -1244,8 +1829,10 @@ class Client:
         return False, False
 
     def launch(self, sandbox: Sandbox) -> str:
-        opts = copy.deepcopy(sandbox.options())
-        opts.launch_entrypoint = True
+        # create() never mutates its options, so a shallow copy is enough to
+        # keep the builder's spec untouched; reused specs skip a deep walk of
+        # every rule, mount and secret on each launch.
+        opts = dataclasses.replace(sandbox.options(), launch_entrypoint=True)
         return self.create(opts)
 
     def port_forward(self, *specs: str) -> list[PortForwardBinding]:
@@ -1375,10 +1962,10 @@ class Client:
 
         result = self._send_request("exec", params, timeout=timeout)
 
-        return ExecResult(
+        return ExecResult._from_output(
             exit_code=result["exit_code"],
-            stdout=base64.b64decode(result["stdout"]).decode("utf-8", errors="replace"),
-            stderr=base64.b64decode(result["stderr"]).decode("utf-8", errors="replace"),
+            stdout=b64decode(result["stdout"]),
+            stderr=b64decode(result["stderr"]),
             duration_ms=result["duration_ms"],
         )
 
@@ -1408,18 +1995,14 @@ class Client:
         if working_dir:
             params["working_dir"] = working_dir
 
+        write_stdout = _chunk_writer(stdout)
+        write_stderr = _chunk_writer(stderr)
+
         def on_notification(method: str, notif_params: dict[str, Any]) -> None:
-            data_b64 = notif_params.get("data", "")
-            try:
-                decoded = base64.b64decode(data_b64).decode("utf-8", errors="replace")
-            except Exception:
-                return
-            if method == "exec_stream.stdout" and stdout is not None:
-                stdout.write(decoded)
-                stdout.flush()
-            elif method == "exec_stream.stderr" and stderr is not None:
-                stderr.write(decoded)
-                stderr.flush()
+            if method == "exec_stream.stdout":
+                write_stdout(notif_params.get("data", ""))
+            elif method == "exec_stream.stderr":
+                write_stderr(notif_params.get("data", ""))
 
         result = self._send_request(
             "exec_stream", params, on_notification=on_notification, timeout=timeout
@@ -1433,7 +2016,7 @@ class Client:
     def log(self, timeout: float | None = None) -> str:
         """Return the current buffered VM log."""
         result = self._send_request("log", timeout=timeout)
-        return base64.b64decode(result["content"]).decode("utf-8", errors="replace")
+        return b64decode(result["content"]).decode("utf-8", errors="replace")
 
     def log_stream(
         self,
@@ -1441,11 +2024,12 @@ class Client:
         timeout: float | None = None,
     ) -> None:
         """Stream the VM log until the request completes or is cancelled."""
+        write_stdout = _chunk_writer(stdout)
 
         def on_notification(method: str, notif_params: dict[str, Any]) -> None:
             if method != "log_stream.data":
                 return
-            self._write_decoded_chunk(stdout, str(notif_params.get("data", "")))
+            write_stdout(str(notif_params.get("data", "")))
 
         self._send_request(
             "log_stream", on_notification=on_notification, timeout=timeout
@@ -1459,18 +2043,6 @@ class Client:
                 return True
         return False
 
-    def _write_decoded_chunk(self, writer: IO[str] | None, data_b64: str) -> None:
-        if writer is None:
-            return
-        try:
-            decoded = base64.b64decode(data_b64).decode("utf-8", errors="replace")
-        except Exception:
-            return
-        writer.write(decoded)
-        flush = getattr(writer, "flush", None)
-        if callable(flush):
-            flush()
-
     def _pump_exec_input(
         self,
         ready_event: threading.Event,
@@ -1490,9 +2062,19 @@ class Client:
             self._send_fire_and_forget(eof_method, {"id": req_id})
             return
 
+        # Readers exposing readinto() fill a reused buffer instead of
+        # returning a fresh bytes object per chunk.
+        readinto = getattr(stdin, "readinto", None)
+        buf = memoryview(bytearray(4096)) if readinto is not None else None
+
         while not done_event.is_set():
+            chunk: str | bytes | memoryview | None
             try:
-                chunk = stdin.read(4096)
+                if readinto is not None and buf is not None:
+                    n = readinto(buf)
+                    chunk = None if n is None else buf[:n]
+                else:
+                    chunk = stdin.read(4096)
             except Exception:
                 self._send_fire_and_forget(eof_method, {"id": req_id})
                 return
@@ -1500,7 +2082,10 @@ class Client:
             if chunk is None:
                 continue
 
-            if isinstance(chunk, str):
+            chunk_bytes: bytes | memoryview
+            if isinstance(chunk, memoryview):
+                chunk_bytes = chunk
+            elif isinstance(chunk, str):
                 chunk_bytes = chunk.encode("utf-8")
             elif isinstance(chunk, bytes):
                 chunk_bytes = chunk
@@ -1513,10 +2098,8 @@ class Client:
 
             self._send_fire_and_forget(
                 chunk_method,
-                {
-                    "id": req_id,
-                    "data": base64.b64encode(chunk_bytes).decode("ascii"),
-                },
+                encoded_params=b'{"id":%d,"data":"%s"}'
+                % (req_id, b64encode(chunk_bytes)),
             )
 
     def exec_pipe(
@@ -1560,16 +2143,19 @@ class Client:
         )
         pump_thread.start()
 
+        write_stdout = _chunk_writer(stdout)
+        write_stderr = _chunk_writer(stderr)
+
         def on_notification(method: str, notif_params: dict[str, Any]) -> None:
             if method == "exec_pipe.ready":
                 state["req_id"] = notif_params.get("id")
                 ready_event.set()
                 return
             if method == "exec_pipe.stdout":
-                self._write_decoded_chunk(stdout, str(notif_params.get("data", "")))
+                write_stdout(str(notif_params.get("data", "")))
                 return
             if method == "exec_pipe.stderr":
-                self._write_decoded_chunk(stderr, str(notif_params.get("data", "")))
+                write_stderr(str(notif_params.get("data", "")))
 
         try:
             result = self._send_request(
@@ -1660,13 +2246,15 @@ class Client:
             resize_thread = threading.Thread(target=pump_resize, daemon=True)
             resize_thread.start()
 
+        write_stdout = _chunk_writer(stdout)
+
         def on_notification(method: str, notif_params: dict[str, Any]) -> None:
             if method == "exec_tty.ready":
                 state["req_id"] = notif_params.get("id")
                 ready_event.set()
                 return
             if method == "exec_tty.stdout":
-                self._write_decoded_chunk(stdout, str(notif_params.get("data", "")))
+                write_stdout(str(notif_params.get("data", "")))
 
         try:
             result = self._send_request(
@@ -1699,17 +2287,44 @@ class Client:
             mode: File permission mode (default: 0644).
             timeout: Optional timeout in seconds.
         """
+        encoded_params = self._encode_write_file(path, content, mode)
+        self._send_request("write_file", timeout=timeout, encoded_params=encoded_params)
+
+    def write_files(
+        self,
+        files: Mapping[str, bytes | str],
+        mode: int = 0o644,
+        timeout: float | None = None,
+    ) -> None:
+        """Write several files in the sandbox with a single round trip.
+
+        Behaves like calling :meth:`write_file` for each entry, but all
+        requests are sent back-to-back and complete concurrently.
+
+        Args:
+            files: Mapping of guest path to contents (bytes or str).
+            mode: File permission mode applied to every file (default: 0644).
+            timeout: Optional timeout in seconds for the whole batch.
+        """
+        calls = [
+            ("write_file", self._encode_write_file(path, content, mode))
+            for path, content in files.items()
+        ]
+        self._send_batch(calls, timeout=timeout)
+
+    def _encode_write_file(self, path: str, content: bytes | str, mode: int) -> bytes:
         if isinstance(content, str):
             content = content.encode("utf-8")
         self._apply_local_action_hooks("write", path, len(content), mode)
         content = self._apply_local_write_mutations(path, content, mode)
 
-        params: dict[str, Any] = {
-            "path": path,
-            "content": base64.b64encode(content).decode("ascii"),
-            "mode": mode,
-        }
-        self._send_request("write_file", params, timeout=timeout)
+        # Base64 output never needs JSON escaping, so splice it into the
+        # params object directly rather than re-scanning it while serializing.
+        return b'{"path":%s,"content":"%s","mode":%d}' % (
+            _json_dumps(path),
+            b64encode(content),
+            mode,
+        )
 
     def read_file(self, path: str, timeout: float | None = None) -> bytes:
         """Read a file from the sandbox.
@@ -1720,7 +2335,7 @@ class Client:
         """
         self._apply_local_action_hooks("read", path, 0, 0)
         result = self._send_request("read_file", {"path": path}, timeout=timeout)
-        return base64.b64decode(result["content"])
+        return b64decode(result["content"])
 
     def list_files(self, path: str, timeout: float | None = None) -> list[FileInfo]:
         """List files in a directory.
@@ -1731,12 +2346,4 @@ class Client:
         """
         self._apply_local_action_hooks("readdir", path, 0, 0)
         result = self._send_request("list_files", {"path": path}, timeout=timeout)
-        return [
-            FileInfo(
-                name=f["name"],
-                size=f["size"],
-                mode=f["mode"],
-                is_dir=f["is_dir"],
-            )
-            for f in result.get("files", [])
-        ]
+        return [FileInfo(*_file_info_fields(f)) for f in result.get("files", ())]
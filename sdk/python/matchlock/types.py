@@ -54,7 +54,7 @@ NetworkHookPhase: TypeAlias = Literal["", "before", "after"]
 NetworkHookAction: TypeAlias = Literal["allow", "block", "mutate"]
 
 
-@dataclass
+@dataclass(slots=True)
 class Config:
     """Client configuration."""
 
@@ -62,10 +62,15 @@ class Config:
     """Path to the matchlock binary."""
 
     use_sudo: bool = False
-    """Whether to run matchlock with sudo (required for TAP devices on Linux)."""
+    """Whether to run matchlock with sudo (required for TAP devices on Linux).
+    Ignored when the caller is already root."""
 
+    use_socketpair: bool = False
+    """Talk to matchlock over a Unix socketpair with 1 MiB kernel buffers
+    instead of 64 KiB pipes. Speeds up large file and exec payloads (POSIX only)."""
 
-@dataclass
+
+@dataclass(slots=True)
 class MountConfig:
     """VFS mount configuration."""
 
@@ -87,7 +92,7 @@ class MountConfig:
         return d
 
 
-@dataclass
+@dataclass(slots=True)
 class VFSHookRule:
     """Single VFS interception rule."""
 
@@ -136,7 +141,7 @@ class VFSHookRule:
         return d
 
 
-@dataclass
+@dataclass(slots=True)
 class VFSInterceptionConfig:
     """Host-side VFS interception configuration."""
 
@@ -155,9 +160,12 @@ class VFSInterceptionConfig:
         return d
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NetworkBodyTransform:
-    """Literal replacement applied to response bodies."""
+    """Literal replacement applied to response bodies.
+
+    Immutable and hashable, so duplicate transforms can be dropped with a set.
+    """
 
     find: str
     """Find string."""
@@ -172,7 +180,7 @@ class NetworkBodyTransform:
         return d
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkHookRequest:
     """Input delivered to an SDK-local network callback hook."""
 
@@ -187,7 +195,7 @@ class NetworkHookRequest:
     is_sse: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkHookRequestMutation:
     """Request mutation returned by an SDK-local network callback hook."""
 
@@ -196,7 +204,7 @@ class NetworkHookRequestMutation:
     path: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkHookResponseMutation:
     """Response mutation returned by an SDK-local network callback hook."""
 
@@ -205,7 +213,7 @@ class NetworkHookResponseMutation:
     set_body: bytes | str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkHookResult:
     """Result returned by an SDK-local network callback hook."""
 
@@ -214,7 +222,7 @@ class NetworkHookResult:
     response: NetworkHookResponseMutation | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkHookRule:
     """Single network interception rule."""
 
@@ -299,7 +307,7 @@ class NetworkHookRule:
         return d
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkInterceptionConfig:
     """Host-side network interception configuration."""
 
@@ -313,7 +321,7 @@ class NetworkInterceptionConfig:
         return d
 
 
-@dataclass
+@dataclass(slots=True)
 class VFSMutateRequest:
     """Input to SDK-local mutate hooks."""
 
@@ -324,7 +332,7 @@ class VFSMutateRequest:
     gid: int
 
 
-@dataclass
+@dataclass(slots=True)
 class VFSActionRequest:
     """Input to SDK-local action hooks."""
 
@@ -336,7 +344,7 @@ class VFSActionRequest:
     gid: int
 
 
-@dataclass
+@dataclass(slots=True)
 class VFSHookEvent:
     """Metadata delivered to SDK-local after hooks."""
 
@@ -348,7 +356,7 @@ class VFSHookEvent:
     gid: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Secret:
     """Secret to inject into the sandbox.
 
@@ -367,7 +375,7 @@ class Secret:
     """Hosts where this secret can be used (supports wildcards)."""
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageConfig:
     """OCI image metadata for user/entrypoint/cmd/workdir/env."""
 
@@ -401,7 +409,7 @@ class ImageConfig:
         return d
 
 
-@dataclass
+@dataclass(slots=True)
 class PortForward:
     """Port mapping from host to guest."""
 
@@ -412,7 +420,7 @@ class PortForward:
     """Remote guest port."""
 
 
-@dataclass
+@dataclass(slots=True)
 class PortForwardBinding:
     """Realized local listener binding."""
 
@@ -426,7 +434,7 @@ class PortForwardBinding:
     """Remote guest port."""
 
 
-@dataclass
+@dataclass(slots=True)
 class CreateOptions:
     """Options for creating a sandbox."""
 
@@ -503,9 +511,54 @@ class CreateOptions:
     """Start image ENTRYPOINT/CMD in detached mode during create."""
 
 
+class _LazyText:
+    """Data descriptor for command output held as bytes until read as text.
+
+    Assigning ``str`` or ``bytes`` is accepted; whichever form is missing
+    is derived (UTF-8, invalid bytes replaced) and cached on first access.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._raw = name + "_bytes"
+
+    def __get__(self, obj: Any, objtype: type | None = None) -> Any:
+        if obj is None:
+            return self
+        state = obj.__dict__
+        text = state[self.name]
+        if text is None:
+            text = state[self.name] = state[self._raw].decode("utf-8", errors="replace")
+        return text
+
+    def __set__(self, obj: Any, value: str | bytes) -> None:
+        state = obj.__dict__
+        if isinstance(value, str):
+            state[self.name], state[self._raw] = value, None
+        else:
+            state[self.name], state[self._raw] = None, bytes(value)
+
+    def set_raw(self, obj: Any, raw: bytes) -> None:
+        """Store ``raw`` as the output of ``obj``, to be decoded on read."""
+        obj.__dict__[self.name], obj.__dict__[self._raw] = None, raw
+
+    def raw(self, obj: Any) -> bytes:
+        """Return the output of ``obj`` as bytes, encoding it if needed."""
+        state = obj.__dict__
+        raw = state[self._raw]
+        if raw is None:
+            raw = state[self._raw] = state[self.name].encode("utf-8")
+        return raw
+
+
 @dataclass
 class ExecResult:
-    """Result of command execution."""
+    """Result of command execution.
+
+    Output is kept as the raw bytes received and only decoded the first time
+    ``stdout``/``stderr`` is read; ``stdout_bytes``/``stderr_bytes`` give the
+    undecoded output.
+    """
 
     exit_code: int
     """The command's exit code."""
@@ -519,8 +572,36 @@ class ExecResult:
     duration_ms: int
     """Execution time in milliseconds."""
 
+    @classmethod
+    def _from_output(
+        cls, exit_code: int, stdout: bytes, stderr: bytes, duration_ms: int
+    ) -> "ExecResult":
+        """Build a result from raw output without decoding it up front."""
+        result = cls(exit_code, "", "", duration_ms)
+        _EXEC_STDOUT.set_raw(result, stdout)
+        _EXEC_STDERR.set_raw(result, stderr)
+        return result
 
-@dataclass
+    @property
+    def stdout_bytes(self) -> bytes:
+        """Raw standard output."""
+        return _EXEC_STDOUT.raw(self)
+
+    @property
+    def stderr_bytes(self) -> bytes:
+        """Raw standard error."""
+        return _EXEC_STDERR.raw(self)
+
+
+# Installed after @dataclass so fields() and type hints still report ``str``.
+_EXEC_STDOUT = _LazyText("stdout")
+_EXEC_STDERR = _LazyText("stderr")
+for _descriptor in (_EXEC_STDOUT, _EXEC_STDERR):
+    setattr(ExecResult, _descriptor.name, _descriptor)
+del _descriptor
+
+
+@dataclass(slots=True)
 class ExecStreamResult:
     """Result of streaming command execution.
 
@@ -535,7 +616,7 @@ class ExecStreamResult:
     """Execution time in milliseconds."""
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecPipeResult:
     """Result of pipe-mode command execution."""
 
@@ -546,7 +627,7 @@ class ExecPipeResult:
     """Execution time in milliseconds."""
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecInteractiveResult:
     """Result of interactive TTY command execution."""
 
@@ -557,7 +638,7 @@ class ExecInteractiveResult:
     """Execution time in milliseconds."""
 
 
-@dataclass
+@dataclass(slots=True)
 class FileInfo:
     """File metadata."""
 
@@ -574,7 +655,7 @@ class FileInfo:
     """Whether this is a directory."""
 
 
-@dataclass
+@dataclass(slots=True)
 class VolumeInfo:
     """Named volume metadata."""
 
@@ -6,6 +6,10 @@ These tests mock the subprocess to avoid needing a real matchlock binary.
 import base64
 import io
 import json
+import os
+import socket
+import subprocess
+import sys
 import threading
 from unittest.mock import MagicMock, patch
 
@@ -14,10 +18,18 @@ import pytest
 from matchlock.builder import Sandbox
 from matchlock.client import (
     Client,
+    _Completion,
+    _chunk_writer,
+    _DaemonWorkerPool,
+    _LocalNetworkHook,
     _LocalVFSActionHook,
     _LocalVFSMutateHook,
     _LocalVFSHook,
     _PendingRequest,
+    _compile_path_matcher,
+    _json_dumps,
+    _json_dumps_line,
+    _wait_for_exit,
 )
 from matchlock.types import (
     Config,
@@ -43,12 +55,19 @@ from matchlock.types import (
 )
 
 
+class FakeStdin(io.BytesIO):
+    """Binary stdin pipe whose getvalue() decodes, for easy assertions."""
+
+    def getvalue(self) -> str:
+        return super().getvalue().decode("utf-8")
+
+
 class FakeProcess:
     """A fake subprocess.Popen that simulates the matchlock RPC process."""
 
     def __init__(self):
-        self.stdin = io.StringIO()
-        self._stdout_lines: list[str] = []
+        self.stdin = FakeStdin()
+        self._stdout_lines: list[bytes] = []
         self._stdout_lock = threading.Lock()
         self._stdout_event = threading.Event()
         self._closed = False
@@ -58,11 +77,11 @@ class FakeProcess:
     def poll(self):
         return self._returncode
 
-    def readline(self) -> str:
+    def readline(self) -> bytes:
         while True:
             with self._stdout_lock:
                 if self._closed and not self._stdout_lines:
-                    return ""
+                    return b""
                 if self._stdout_lines:
                     return self._stdout_lines.pop(0)
             self._stdout_event.wait(timeout=0.1)
@@ -70,7 +89,12 @@ class FakeProcess:
 
     def push_response(self, data: dict) -> None:
         with self._stdout_lock:
-            self._stdout_lines.append(json.dumps(data) + "\n")
+            self._stdout_lines.append(json.dumps(data).encode("utf-8") + b"\n")
+        self._stdout_event.set()
+
+    def push_line(self, line: bytes) -> None:
+        with self._stdout_lock:
+            self._stdout_lines.append(line)
         self._stdout_event.set()
 
     def close_stdout(self):
@@ -112,6 +136,30 @@ class TestPendingRequest:
         assert pr.on_notification is cb
 
 
+class TestCompletion:
+    def test_wait_times_out_until_set(self):
+        done = _Completion()
+        assert done.wait(timeout=0.01) is False
+        done.set()
+        done.set()
+        assert done.is_set()
+        assert done.wait() is True
+
+    def test_set_wakes_every_waiter(self):
+        done = _Completion()
+        woke = []
+        waiters = [
+            threading.Thread(target=lambda: woke.append(done.wait(timeout=2)))
+            for _ in range(3)
+        ]
+        for t in waiters:
+            t.start()
+        done.set()
+        for t in waiters:
+            t.join(timeout=2)
+        assert woke == [True, True, True]
+
+
 class TestClientInit:
     def test_default_config(self):
         client = Client()
@@ -145,6 +193,35 @@ class TestClientContextManager:
         assert client._process is not None
         fake.close_stdout()
 
+    @patch("subprocess.Popen")
+    def test_start_uses_binary_pipes(self, mock_popen):
+        fake = FakeProcess()
+        mock_popen.return_value = fake
+        client = Client(Config(binary_path="fake"))
+        client.start()
+        kwargs = mock_popen.call_args.kwargs
+        assert not kwargs.get("text")
+        assert kwargs["bufsize"] == 64 * 1024
+        fake.close_stdout()
+
+    @patch("os.geteuid", return_value=1000)
+    @patch("subprocess.Popen")
+    def test_start_with_sudo(self, mock_popen, _geteuid):
+        fake = FakeProcess()
+        mock_popen.return_value = fake
+        Client(Config(binary_path="fake", use_sudo=True)).start()
+        assert mock_popen.call_args.args[0] == ["sudo", "fake", "rpc"]
+        fake.close_stdout()
+
+    @patch("os.geteuid", return_value=0)
+    @patch("subprocess.Popen")
+    def test_start_as_root_skips_sudo(self, mock_popen, _geteuid):
+        fake = FakeProcess()
+        mock_popen.return_value = fake
+        Client(Config(binary_path="fake", use_sudo=True)).start()
+        assert mock_popen.call_args.args[0] == ["fake", "rpc"]
+        fake.close_stdout()
+
     @patch("subprocess.Popen")
     def test_exit_closes(self, mock_popen):
         fake = FakeProcess()
@@ -166,6 +243,331 @@ class TestClientContextManager:
         t.join(timeout=2)
 
 
+_ECHO_RPC_SERVER = """\
+import json, sys
+for line in sys.stdin.buffer:
+    req = json.loads(line)
+    sys.stdout.write(json.dumps({"jsonrpc": "2.0", "result": req.get("params"), "id": req["id"]}) + "\\n")
+    sys.stdout.flush()
+"""
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires AF_UNIX")
+class TestClientSocketpairTransport:
+    def test_round_trip_and_close(self, tmp_path):
+        script = tmp_path / "server.py"
+        script.write_text(_ECHO_RPC_SERVER)
+        binary = tmp_path / "matchlock"
+        binary.write_text(f"#!/bin/sh\nexec {sys.executable} {script}\n")
+        binary.chmod(0o755)
+
+        client = Client(Config(binary_path=str(binary), use_socketpair=True))
+        client.start()
+        payload = "x" * (1 << 20)
+        assert client._send_request("echo", {"data": payload}) == {"data": payload}
+        client.close()
+        assert client._process.poll() == 0
+        assert client._transport_sock is None
+
+
+class TestClientWrite:
+    def test_large_request_bypasses_buffer(self):
+        r, w = os.pipe()
+        client = Client(Config(binary_path="fake"))
+        client._process = MagicMock()
+        client._process.stdin = open(w, "wb")
+        data = b"x" * (256 * 1024) + b"\n"
+        received = bytearray()
+
+        def drain():
+            with open(r, "rb") as f:
+                received.extend(f.read())
+
+        t = threading.Thread(target=drain, daemon=True)
+        t.start()
+        client._process.stdin.write(b"small\n")
+        client._write(data)
+        client._process.stdin.close()
+        t.join(timeout=2)
+        assert bytes(received) == b"small\n" + data
+
+    def test_concurrent_writes_are_coalesced(self):
+        client, fake = make_client_with_fake()
+        writes = []
+        fake.stdin.write = writes.append
+        try:
+            client._write_lock.acquire()
+            threads = [
+                threading.Thread(target=client._write, args=(b"%d\n" % i,))
+                for i in range(3)
+            ]
+            for t in threads:
+                t.start()
+            while len(client._write_batch.frames) < 3:
+                threading.Event().wait(0.01)
+            client._write_lock.release()
+            for t in threads:
+                t.join(timeout=2)
+            assert len(writes) == 1
+            assert sorted(writes[0].splitlines()) == [b"0", b"1", b"2"]
+        finally:
+            fake.close_stdout()
+
+    def test_failed_write_is_raised_to_every_queued_caller(self):
+        client, fake = make_client_with_fake()
+        writes = []
+
+        def failing_write(data):
+            writes.append(data)
+            raise BrokenPipeError("stdin closed")
+
+        fake.stdin.write = failing_write
+        errors = []
+
+        def send(frame):
+            try:
+                client._write(frame)
+            except BrokenPipeError as e:
+                errors.append(e)
+
+        try:
+            client._write_lock.acquire()
+            threads = [
+                threading.Thread(target=send, args=(b"%d\n" % i,)) for i in range(2)
+            ]
+            for t in threads:
+                t.start()
+            while len(client._write_batch.frames) < 2:
+                threading.Event().wait(0.01)
+            client._write_lock.release()
+            for t in threads:
+                t.join(timeout=2)
+            assert len(writes) == 1
+            assert len(errors) == 2
+        finally:
+            fake.close_stdout()
+
+    def test_large_request_without_fd_uses_buffer(self):
+        client, fake = make_client_with_fake()
+        try:
+            data = b"y" * (256 * 1024) + b"\n"
+            client._write(data)
+            assert fake.stdin.getvalue() == data.decode()
+        finally:
+            fake.close_stdout()
+
+
+class TestJSONEncoding:
+    def test_non_string_keys_are_encoded(self):
+        assert json.loads(_json_dumps({1: "a", "b": 2})) == {"1": "a", "b": 2}
+
+    def test_lone_surrogate_is_escaped(self):
+        data = _json_dumps({"path": "/tmp/\udcff"})
+        assert json.loads(data) == {"path": "/tmp/\udcff"}
+
+    def test_dumps_line_appends_newline_on_fallback(self):
+        line = _json_dumps_line({"path": "\udcff", 2: True})
+        assert line.endswith(b"\n")
+        assert json.loads(line) == {"path": "\udcff", "2": True}
+
+
+class TestClientReadFraming:
+    def test_iter_lines_splits_chunks_on_newlines(self):
+        r, w = os.pipe()
+        big = b"z" * (200 * 1024)
+
+        def feed():
+            parts = (b'{"a":1}\n{"b"', b":2}\n\n", big[:1000], big[1000:] + b"\n", b"x")
+            for part in parts:
+                os.write(w, part)
+                threading.Event().wait(0.01)
+            os.close(w)
+
+        t = threading.Thread(target=feed, daemon=True)
+        t.start()
+        with open(r, "rb") as f:
+            lines = [bytes(line) for line in Client._iter_lines(f)]
+        t.join(timeout=2)
+        assert lines == [b'{"a":1}', b'{"b":2}', b"", big]
+
+    def test_reader_over_real_fd_dispatches_and_fails_on_eof(self):
+        r, w = os.pipe()
+        client = Client(Config(binary_path="fake"))
+        client._process = MagicMock()
+        client._process.stdout = open(r, "rb")
+        first, second = _PendingRequest(), _PendingRequest()
+        client._pending.update({1: first, 2: second})
+        reader = threading.Thread(target=client._reader_loop, daemon=True)
+        reader.start()
+        os.write(w, b'{"jsonrpc":"2.0","result":{"ok":true},"id":1}\n')
+        assert first.event.wait(timeout=2)
+        assert first.result == {"ok": True}
+        os.close(w)
+        assert second.event.wait(timeout=2)
+        assert isinstance(second.error, MatchlockError)
+        reader.join(timeout=2)
+
+
+class TestCompilePathMatcher:
+    def test_empty_pattern_matches_everything(self):
+        assert _compile_path_matcher("") is None
+
+    def test_literal_pattern_compares_exactly(self):
+        match = _compile_path_matcher("/workspace/a.txt")
+        assert match("/workspace/a.txt")
+        assert not match("/workspace/a.txt.bak")
+
+    def test_glob_pattern(self):
+        match = _compile_path_matcher("/workspace/*.txt")
+        assert match("/workspace/a.txt")
+        assert not match("/workspace/a.py")
+
+
+class TestChunkWriter:
+    def test_text_writer_keeps_split_characters(self):
+        out = io.StringIO()
+        write = _chunk_writer(out)
+        data = "héllo".encode()
+        write(base64.b64encode(data[:2]).decode())
+        write(base64.b64encode(data[2:]).decode())
+        assert out.getvalue() == "héllo"
+
+    def test_utf8_text_wrapper_goes_through_text_layer(self):
+        raw = io.BytesIO()
+        out = io.TextIOWrapper(raw, encoding="utf-8", newline="\r\n")
+        write = _chunk_writer(out)
+        write(base64.b64encode(b"a\xff\n").decode())
+        out.write("after")
+        out.flush()
+        assert raw.getvalue() == "a\ufffd\r\nafter".encode()
+
+    def test_none_writer_is_ignored(self):
+        _chunk_writer(None)("aGk=")
+
+
+def _read_reply(conn: socket.socket) -> bytes:
+    with conn.makefile("rb") as reader:
+        return reader.readline().rstrip(b"\n")
+
+
+class TestNetworkHookServer:
+    def test_serves_concurrent_callbacks_on_pool(self):
+        client = Client(Config(binary_path="fake"))
+        threads = set()
+
+        def hook(req):
+            threads.add(threading.current_thread().name)
+            return None
+
+        path = client._start_network_hook_server(
+            {"cb": _LocalNetworkHook(name="h", phase="", timeout_ms=0, hook=hook)}
+        )
+        try:
+            for _ in range(3):
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+                    conn.connect(path)
+                    conn.sendall(b'{"callback_id":"cb","phase":"before"}\n')
+                    assert _read_reply(conn) == b"{}"
+            assert threads
+            assert all(name.startswith("matchlock-network-hook") for name in threads)
+        finally:
+            client.close()
+
+    def test_reads_request_split_across_chunks(self):
+        client = Client(Config(binary_path="fake"))
+        seen = []
+
+        def hook(req):
+            seen.append(req.path)
+            return None
+
+        path = client._start_network_hook_server(
+            {"cb": _LocalNetworkHook(name="h", phase="", timeout_ms=0, hook=hook)}
+        )
+        try:
+            body = b'{"callback_id":"cb","phase":"before","path":"/x"' + b" " * (
+                40 * 1024
+            )
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+                conn.settimeout(2)
+                conn.connect(path)
+                conn.sendall(body[:10])
+                threading.Event().wait(0.05)
+                conn.sendall(body[10:] + b"}\n")
+                assert _read_reply(conn) == b"{}"
+            assert seen == ["/x"]
+        finally:
+            client.close()
+
+    def test_callback_threads_are_capped(self):
+        client = Client(Config(binary_path="fake"))
+        release = threading.Event()
+        running = []
+
+        def hook(req):
+            running.append(threading.current_thread().name)
+            release.wait(5)
+            return None
+
+        path = client._start_network_hook_server(
+            {"cb": _LocalNetworkHook(name="h", phase="", timeout_ms=0, hook=hook)}
+        )
+        conns = []
+        try:
+            client._network_hook_pool = _DaemonWorkerPool(
+                "matchlock-network-hook", max_workers=2
+            )
+            for _ in range(4):
+                conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                conn.settimeout(2)
+                conn.connect(path)
+                conn.sendall(b'{"callback_id":"cb","phase":"before"}\n')
+                conns.append(conn)
+            threading.Event().wait(0.2)
+            assert len(running) == 2
+            release.set()
+            for conn in conns:
+                assert _read_reply(conn) == b"{}"
+            assert len(set(running)) <= 2
+        finally:
+            release.set()
+            for conn in conns:
+                conn.close()
+            client.close()
+
+    def test_stalled_connection_times_out_without_blocking_others(self):
+        client = Client(Config(binary_path="fake"))
+        release = threading.Event()
+
+        def hook(req):
+            if req.host == "slow":
+                release.wait(5)
+            return None
+
+        path = client._start_network_hook_server(
+            {"cb": _LocalNetworkHook(name="h", phase="", timeout_ms=0, hook=hook)}
+        )
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        slow = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            with patch("matchlock.client._NETWORK_HOOK_READ_TIMEOUT", 0.2):
+                stalled.connect(path)
+                slow.connect(path)
+                slow.sendall(b'{"callback_id":"cb","phase":"before","host":"slow"}\n')
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+                    conn.settimeout(2)
+                    conn.connect(path)
+                    conn.sendall(b'{"callback_id":"cb","phase":"before"}\n')
+                    assert _read_reply(conn) == b"{}"
+                stalled.settimeout(2)
+                assert b"timed out" in _read_reply(stalled)
+        finally:
+            release.set()
+            stalled.close()
+            slow.close()
+            client.close()
+
+
 class TestClientCreate:
     def test_create_requires_image(self):
         client, fake = make_client_with_fake()
@@ -1770,6 +2172,50 @@ class TestClientExecPipe:
         finally:
             fake.close_stdout()
 
+    def test_exec_pipe_prefers_readinto(self):
+        client, fake = make_client_with_fake()
+        try:
+
+            class IntoOnlyReader:
+                def __init__(self, data: bytes) -> None:
+                    self._src = io.BytesIO(data)
+
+                def readinto(self, buf) -> int:
+                    return self._src.readinto(buf)
+
+            def respond():
+                import time
+
+                time.sleep(0.05)
+                fake.push_response(
+                    {
+                        "jsonrpc": "2.0",
+                        "method": "exec_pipe.ready",
+                        "params": {"id": 1},
+                    }
+                )
+                time.sleep(0.05)
+                fake.push_response(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": 1,
+                        "result": {"exit_code": 0, "duration_ms": 5},
+                    }
+                )
+
+            t = threading.Thread(target=respond, daemon=True)
+            t.start()
+
+            client.exec_pipe("cat", stdin=IntoOnlyReader(b"raw bytes\n"))
+
+            reqs = [json.loads(line) for line in fake.stdin.getvalue().splitlines()]
+            stdin_req = next(req for req in reqs if req["method"] == "exec_pipe.stdin")
+            assert base64.b64decode(stdin_req["params"]["data"]) == b"raw bytes\n"
+            assert any(req["method"] == "exec_pipe.stdin_eof" for req in reqs)
+            t.join(timeout=2)
+        finally:
+            fake.close_stdout()
+
 
 class TestClientExecInteractive:
     def test_exec_interactive_streams_and_sends_resize(self):
@@ -1891,6 +2337,90 @@ class TestClientFileOps:
         finally:
             fake.close_stdout()
 
+    def test_write_file_request_is_valid_json(self):
+        client, fake = make_client_with_fake()
+        try:
+
+            def respond():
+                import time
+
+                time.sleep(0.05)
+                fake.push_response({"jsonrpc": "2.0", "id": 1, "result": {}})
+
+            t = threading.Thread(target=respond, daemon=True)
+            t.start()
+            client.write_file('/workspace/"quoted"\u00e9.txt', b"\xffdata", mode=0o600)
+            req = json.loads(fake.stdin.getvalue().splitlines()[0])
+            assert req["jsonrpc"] == "2.0"
+            assert req["method"] == "write_file"
+            assert req["id"] == 1
+            assert req["params"]["path"] == '/workspace/"quoted"\u00e9.txt'
+            assert base64.b64decode(req["params"]["content"]) == b"\xffdata"
+            assert req["params"]["mode"] == 0o600
+            t.join(timeout=2)
+        finally:
+            fake.close_stdout()
+
+    def test_write_files_sends_one_batch(self):
+        client, fake = make_client_with_fake()
+        try:
+
+            def respond():
+                import time
+
+                time.sleep(0.05)
+                fake.push_response({"jsonrpc": "2.0", "id": 2, "result": {}})
+                fake.push_response({"jsonrpc": "2.0", "id": 1, "result": {}})
+
+            t = threading.Thread(target=respond, daemon=True)
+            t.start()
+            client.write_files({"/workspace/a.sh": "echo a", "/workspace/b": b"\x00"})
+            reqs = [json.loads(line) for line in fake.stdin.getvalue().splitlines()]
+            assert [r["id"] for r in reqs] == [1, 2]
+            assert [r["method"] for r in reqs] == ["write_file", "write_file"]
+            assert reqs[0]["params"]["path"] == "/workspace/a.sh"
+            assert base64.b64decode(reqs[1]["params"]["content"]) == b"\x00"
+            assert client._pending == {}
+            t.join(timeout=2)
+        finally:
+            fake.close_stdout()
+
+    def test_write_files_raises_first_error(self):
+        client, fake = make_client_with_fake()
+        try:
+
+            def respond():
+                import time
+
+                time.sleep(0.05)
+                fake.push_response({"jsonrpc": "2.0", "id": 1, "result": {}})
+                fake.push_response(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": 2,
+                        "error": {"code": -32000, "message": "disk full"},
+                    }
+                )
+
+            t = threading.Thread(target=respond, daemon=True)
+            t.start()
+            with pytest.raises(RPCError, match="disk full"):
+                client.write_files({"/workspace/a": "a", "/workspace/b": "b"})
+            t.join(timeout=2)
+        finally:
+            fake.close_stdout()
+
+    def test_write_files_timeout_cancels_outstanding(self):
+        client, fake = make_client_with_fake()
+        try:
+            with pytest.raises(TimeoutError):
+                client.write_files({"/workspace/a": "a"}, timeout=0.05)
+            reqs = [json.loads(line) for line in fake.stdin.getvalue().splitlines()]
+            assert reqs[-1]["method"] == "cancel"
+            assert reqs[-1]["params"] == {"id": 1}
+        finally:
+            fake.close_stdout()
+
     def test_write_file_applies_local_mutate_hook(self):
         client, fake = make_client_with_fake()
         try:
@@ -2117,7 +2647,43 @@ class TestClientFileOps:
             fake.close_stdout()
 
 
+_BLOCKED_HOOK_SCRIPT = """\
+import threading
+from matchlock.client import Client, _LocalVFSHook
+from matchlock.types import Config
+
+started = threading.Event()
+
+def hook(event):
+    started.set()
+    threading.Event().wait()
+
+client = Client(Config(binary_path="fake"))
+client._set_local_vfs_hooks(
+    [_LocalVFSHook(name="block", ops=set(), path="", timeout_ms=0, dangerous=False, hook=hook)],
+    [],
+    [],
+)
+client._handle_vfs_file_event("write", "/x", 0, 0, 0, 0)
+assert started.wait(5)
+client.close()
+"""
+
+
 class TestVFSCallbackNotifications:
+    def test_blocked_hook_does_not_prevent_exit(self):
+        import matchlock
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(matchlock.__file__))
+        proc = subprocess.run(
+            [sys.executable, "-c", _BLOCKED_HOOK_SCRIPT],
+            env=env,
+            capture_output=True,
+            timeout=10,
+        )
+        assert proc.returncode == 0, proc.stderr
+
     def test_safe_event_callback_suppresses_recursion(self):
         client = Client(Config(binary_path="fake"))
         runs = 0
@@ -2166,6 +2732,76 @@ class TestVFSCallbackNotifications:
         threading.Event().wait(0.1)
         assert runs == 1
 
+    def test_safe_events_dropped_while_run_pending(self):
+        client = Client(Config(binary_path="fake"))
+        seen = []
+
+        client._set_local_vfs_hooks(
+            [
+                _LocalVFSHook(
+                    name="after",
+                    ops={"write"},
+                    path="",
+                    timeout_ms=0,
+                    dangerous=False,
+                    hook=lambda event: seen.append(event.path),
+                )
+            ],
+            [],
+            [],
+        )
+        submitted = []
+
+        def submit(fn, *args):
+            submitted.append((fn, args))
+            return True
+
+        client._submit_vfs_hook_task = submit
+        for name in ("a", "b", "c"):
+            client._handle_vfs_file_event("write", f"/{name}", 0, 0, 0, 0)
+        assert len(submitted) == 1
+
+        fn, args = submitted.pop()
+        fn(*args)
+        assert seen == ["/a"]
+        assert client._vfs_hook_active is False
+
+        client._handle_vfs_file_event("write", "/d", 0, 0, 0, 0)
+        fn, args = submitted.pop()
+        fn(*args)
+        assert seen == ["/a", "/d"]
+
+    def test_reader_skips_event_parse_without_hooks(self):
+        client, fake = make_client_with_fake()
+        try:
+            seen = []
+            client._handle_notification = seen.append
+            event = (
+                b'{"jsonrpc":"2.0","method":"event","params":{"file":{"op":"write"}}}\n'
+            )
+            fake.push_line(event)
+            fake.push_line(b'{"jsonrpc":"2.0","method":"ping","params":{}}\n')
+            threading.Event().wait(0.1)
+            client._set_local_vfs_hooks(
+                [
+                    _LocalVFSHook(
+                        name="h",
+                        ops=set(),
+                        path="",
+                        timeout_ms=0,
+                        dangerous=False,
+                        hook=lambda event: None,
+                    )
+                ],
+                [],
+                [],
+            )
+            fake.push_line(event)
+            threading.Event().wait(0.1)
+            assert [m["method"] for m in seen] == ["ping", "event"]
+        finally:
+            fake.close_stdout()
+
     def test_dangerous_event_callback_allows_recursion(self):
         client = Client(Config(binary_path="fake"))
         runs = 0
@@ -2245,14 +2881,59 @@ class TestClientProcessDied:
         t.start()
 
         pending = _PendingRequest()
-        with client._pending_lock:
-            client._pending[999] = pending
+        client._pending[999] = pending
 
         pending.event.wait(timeout=2)
         assert isinstance(pending.error, MatchlockError)
         assert "unexpectedly" in str(pending.error)
         t.join(timeout=2)
 
+    def test_request_fails_when_process_exits_without_eof(self):
+        client, fake = make_client_with_fake()
+        try:
+
+            def die():
+                import time
+
+                time.sleep(0.05)
+                fake._returncode = 1
+
+            t = threading.Thread(target=die, daemon=True)
+            t.start()
+            with pytest.raises(MatchlockError, match="exited"):
+                client._send_request("exec", {"command": "true"})
+            assert client._pending == {}
+            t.join(timeout=2)
+        finally:
+            fake.close_stdout()
+
+
+class TestWaitForExit:
+    def test_returns_once_process_exits(self):
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        _wait_for_exit(proc, 5)
+        assert proc.returncode == 0
+
+    def test_already_reaped_process_skips_pidfd(self):
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        proc.wait()
+        with patch(
+            "os.pidfd_open",
+            side_effect=AssertionError("pidfd opened for a reaped child"),
+            create=True,
+        ):
+            _wait_for_exit(proc, 0.05)
+        assert proc.returncode == 0
+
+    def test_raises_timeout_while_running(self):
+        proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+        try:
+            with pytest.raises(subprocess.TimeoutExpired):
+                _wait_for_exit(proc, 0.05)
+        finally:
+            proc.kill()
+            proc.wait()
+
 
 class TestClientRemove:
     @patch("subprocess.run")
@@ -1,5 +1,8 @@
 """Tests for matchlock.types."""
 
+import dataclasses
+import typing
+
 from matchlock.types import (
     Config,
     CreateOptions,
@@ -166,6 +169,56 @@ class TestExecResult:
         assert r.exit_code == 1
         assert r.stderr == "error\n"
 
+    def test_bytes_output_decoded_lazily(self):
+        r = ExecResult._from_output(0, b"ok \xff", b"", 1)
+        assert r.stdout_bytes == b"ok \xff"
+        assert r.__dict__["stdout"] is None
+        assert r.stdout == "ok \ufffd"
+        assert r.stdout is r.stdout
+
+    def test_str_output_keeps_bytes(self):
+        r = ExecResult(exit_code=0, stdout="héllo", stderr="", duration_ms=1)
+        assert r.stdout_bytes == "héllo".encode()
+        assert r == ExecResult._from_output(0, b"h\xc3\xa9llo", b"", 1)
+
+    def test_replace_and_asdict_use_text(self):
+        r = ExecResult._from_output(0, b"out", b"err", 5)
+        replaced = dataclasses.replace(r, stdout="new")
+        assert replaced.stdout == "new"
+        assert replaced.stdout_bytes == b"new"
+        assert replaced.stderr == "err"
+        assert dataclasses.asdict(r) == {
+            "exit_code": 0,
+            "stdout": "out",
+            "stderr": "err",
+            "duration_ms": 5,
+        }
+        assert [f.name for f in dataclasses.fields(r)] == [
+            "exit_code",
+            "stdout",
+            "stderr",
+            "duration_ms",
+        ]
+
+    def test_fields_are_typed_as_str(self):
+        hints = typing.get_type_hints(ExecResult)
+        assert hints["stdout"] is str
+        assert hints["stderr"] is str
+        types = {f.name: f.type for f in dataclasses.fields(ExecResult)}
+        assert types["stdout"] is str
+        assert types["stderr"] is str
+
+    def test_assignment_and_repr(self):
+        r = ExecResult._from_output(0, b"a", b"", 1)
+        r.stdout = "b"
+        assert r.stdout == "b"
+        assert r.stdout_bytes == b"b"
+        r.stderr = b"\xffx"
+        assert r.stderr == "\ufffdx"
+        assert repr(r) == (
+            "ExecResult(exit_code=0, stdout='b', stderr='\ufffdx', duration_ms=1)"
+        )
+
 
 class TestExecStreamResult:
     def test_fields(self):
@@ -303,6 +356,14 @@ class TestNetworkBodyTransform:
         t = NetworkBodyTransform(find="foo", replace="bar")
         assert t.to_dict() == {"find": "foo", "replace": "bar"}
 
+    def test_hashable_for_dedup(self):
+        transforms = [
+            NetworkBodyTransform(find="foo", replace="bar"),
+            NetworkBodyTransform(find="foo", replace="bar"),
+            NetworkBodyTransform(find="baz"),
+        ]
+        assert len(set(transforms)) == 2
+
 
 class TestNetworkHookRule:
     def test_to_dict_minimal(self):